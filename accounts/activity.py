@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.utils import timezone
+from core.buffer import WriteBehindBuffer
+from .models import UserActivity
+from .useragent import classify_user_agent
+
+
+class UserActivityBuffer(WriteBehindBuffer):
+    """
+    Buffers activity heartbeats per user and writes them with one
+    bulk_update (plus one bulk_create for users without an activity row).
+    """
+
+    def write(self, items):
+        activities = UserActivity.objects.in_bulk(list(items), field_name='user_id')
+        to_update, to_create = [], []
+
+        for user_id, heartbeat in items.items():
+            activity = activities.get(user_id)
+            if activity is None:
+                activity = UserActivity(user_id=user_id)
+                to_create.append(activity)
+            else:
+                to_update.append(activity)
+
+            user_agent = classify_user_agent(heartbeat['user_agent'])
+            activity.last_activity = heartbeat['last_activity']
+            activity.current_ip = heartbeat['ip']
+            activity.current_device = user_agent.device[:50]
+            activity.current_browser = user_agent.browser_display[:50]
+            activity.is_online = True
+
+        UserActivity.objects.bulk_update(
+            to_update,
+            ['last_activity', 'current_ip', 'current_device', 'current_browser', 'is_online'],
+        )
+        UserActivity.objects.bulk_create(to_create, ignore_conflicts=True)
+        return len(to_update) + len(to_create)
+
+
+activity_buffer = UserActivityBuffer(
+    flush_interval=getattr(settings, 'USER_ACTIVITY_FLUSH_INTERVAL', 30),
+    max_size=getattr(settings, 'USER_ACTIVITY_BUFFER_SIZE', 1000),
+)
+
+
+def record_activity(request):
+    activity_buffer.add(request.user.pk, {
+        'last_activity': timezone.now(),
+        'ip': UserActivity.get_client_ip(request),
+        'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+    })
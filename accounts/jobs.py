@@ -0,0 +1,5 @@
+from core.scheduler import register_job
+from .utils import mark_inactive_users_offline
+
+
+register_job(interval=60, jitter=10)(mark_inactive_users_offline)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from accounts.utils import mark_inactive_users_offline
+
+
+class Command(BaseCommand):
+    help = "Mark users with no activity in the last 5 minutes as offline"
+
+    def handle(self, *args, **options):
+        count = mark_inactive_users_offline()
+        self.stdout.write(self.style.SUCCESS(f"Marked {count} users offline"))
@@ -64,20 +64,21 @@ class UserActivity(models.Model):
         return f"{self.user.username} Activity"
 
     def update_activity(self, request):
-        from user_agents import parse
+        from .useragent import classify_user_agent
         user_agent_str = request.META.get('HTTP_USER_AGENT', '')
-        user_agent = parse(user_agent_str)
+        user_agent = classify_user_agent(user_agent_str)
 
         self.last_activity = timezone.now()
         self.current_ip = self.get_client_ip(request)
-        self.current_device = user_agent.device.family or "Unknown Device"
-        self.current_browser = f"{user_agent.browser.family} {user_agent.browser.version_string}"
-        self.current_os = f"{user_agent.os.family} {user_agent.os.version_string}"
+        self.current_device = user_agent.device
+        self.current_browser = user_agent.browser_display
+        self.current_os = user_agent.os_display
         self.user_agent = user_agent_str  # (Add this field in your model if useful)
         self.is_online = True
         self.save()
 
-    def get_client_ip(self, request):
+    @staticmethod
+    def get_client_ip(request):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
             return x_forwarded_for.split(',')[0].strip()
@@ -3,25 +3,26 @@ from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import UserActivity, UserAccessLog
+from .activity import activity_buffer
+from .useragent import classify_user_agent
 from django.utils.timezone import now
-from user_agents import parse
 
 
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
     user_agent_str = request.META.get('HTTP_USER_AGENT', '')
-    user_agent = parse(user_agent_str)
+    user_agent = classify_user_agent(user_agent_str)
 
-    ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR')).split(',')[0].strip()
+    ip = UserActivity.get_client_ip(request)
 
     # Create log entry
     UserAccessLog.objects.create(
         user=user,
         ip_address=ip,
-        device_type=user_agent.device.family,
-        browser=user_agent.browser.family,
-        os=user_agent.os.family,
+        device_type=user_agent.device,
+        browser=user_agent.browser,
+        os=user_agent.os,
         user_agent=user_agent_str,
     )
 
@@ -34,6 +35,10 @@ def log_user_login(sender, request, user, **kwargs):
 
 @receiver(user_logged_out)
 def log_user_logout(sender, request, user, **kwargs):
+    if user is None:
+        return
+    # Drop any buffered heartbeat so a later flush can't mark the user online again
+    activity_buffer.discard(user.pk)
     activity = getattr(user, 'activity', None)
     if activity:
         activity.is_online = False
@@ -1,3 +1,7 @@
 from django.test import TestCase
+from core.testing import RouteQueryBudgetMixin
 
-# Create your tests here.
+
+class AccountRouteQueryBudgetTests(RouteQueryBudgetMixin, TestCase):
+    urlconfs = ['accounts.urls']
+    default_budget = (8, 50)
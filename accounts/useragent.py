@@ -0,0 +1,77 @@
+from collections import namedtuple
+from functools import lru_cache
+from django.conf import settings
+from django.db.models import Count
+
+USER_AGENT_CACHE_SIZE = getattr(settings, 'USER_AGENT_CACHE_SIZE', 1024)
+
+
+class UserAgentInfo(namedtuple('UserAgentInfo', ['device', 'browser', 'browser_version', 'os', 'os_version'])):
+    __slots__ = ()
+
+    @property
+    def browser_display(self):
+        return f"{self.browser} {self.browser_version}".strip()
+
+    @property
+    def os_display(self):
+        return f"{self.os} {self.os_version}".strip()
+
+
+@lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def _classify(user_agent_str):
+    from user_agents import parse
+
+    user_agent = parse(user_agent_str)
+    return UserAgentInfo(
+        device=user_agent.device.family or "Unknown Device",
+        browser=user_agent.browser.family,
+        browser_version=user_agent.browser.version_string,
+        os=user_agent.os.family,
+        os_version=user_agent.os.version_string,
+    )
+
+
+_prewarm_pending = getattr(settings, 'USER_AGENT_CACHE_PREWARM', False)
+
+
+def classify_user_agent(user_agent_str):
+    """
+    Return the UserAgentInfo for a raw User-Agent header. Results are kept
+    in a bounded LRU cache since the same few hundred strings repeat.
+    """
+    global _prewarm_pending
+    if _prewarm_pending:
+        _prewarm_pending = False
+        prewarm_user_agent_cache()
+    return _classify(user_agent_str or '')
+
+
+def prewarm_user_agent_cache(limit=None):
+    """Classify the most frequent user agents already seen in UserAccessLog."""
+    from .models import UserAccessLog
+
+    user_agents = (
+        UserAccessLog.objects.values('user_agent')
+        .annotate(seen=Count('id'))
+        .order_by('-seen')
+        .values_list('user_agent', flat=True)
+    )[:limit or USER_AGENT_CACHE_SIZE]
+
+    warmed = 0
+    for user_agent_str in user_agents:
+        _classify(user_agent_str or '')
+        warmed += 1
+    return warmed
+
+
+def user_agent_cache_stats():
+    info = _classify.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': round(info.hits / lookups, 4) if lookups else 0.0,
+    }
@@ -10,6 +10,11 @@ from django.http import HttpResponseRedirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import update_session_auth_hash
 from core.permissions import CheckUserPermission
+from core.pagination import KeysetPaginator
+from .activity import activity_buffer
+from .useragent import user_agent_cache_stats
+
+USER_LIST_PAGE_SIZE = 25
 
 
 # Create your views here.
@@ -93,7 +98,7 @@ def all_user_list_view(request):
     searchQ = request.GET.get('search')
     roleQ = request.GET.get('role', '')
 
-    users = User.objects.all()
+    users = User.objects.select_related('profile', 'activity')
 
     if searchQ:
         users = users.filter(
@@ -111,10 +116,13 @@ def all_user_list_view(request):
     elif roleQ == 'customer':
         users = users.filter(is_staff=False, is_superuser=False)
 
-
+    page_obj = KeysetPaginator(users, ('-id',), per_page=USER_LIST_PAGE_SIZE, salt='accounts.users').page(
+        request.GET.get('cursor')
+    )
 
     context = {
-        'users': users,
+        'users': page_obj,
+        'page_obj': page_obj,
         'searchQ': searchQ,
         'roleQ': roleQ,
     }
@@ -128,6 +136,8 @@ def user_activity_list(request):
     return render(request, 'accounts/users/user_activity_list.html', {
         'activities': activities,
         'now': now(),  # ✅ Pass current time to the template
+        'buffer_stats': activity_buffer.stats(),
+        'user_agent_stats': user_agent_cache_stats(),
     })
 
 
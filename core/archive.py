@@ -0,0 +1,241 @@
+"""
+Moves long soft-deleted rows out of the hot tables into <db_table>_archive.
+
+Archive tables mirror the source columns (all nullable, no constraints) plus
+an archived_at timestamp, and are created or widened on demand so they keep
+up with schema changes. Rows move in bounded batches, each in its own
+transaction. A row is only moved when nothing in use still points at it.
+CASCADE dependents that are themselves soft-deleted (product images, child
+menus, ...) and history rows listed in ARCHIVE_CASCADE_MODELS are archived
+along with it. An active dependent, a plain row such as a wishlist entry or
+a cart item still in a cart, or any non-CASCADE reference (OrderDetail ->
+Product is PROTECT) keeps the row where it is until that reference is gone.
+Models with many-to-many relations are refused rather than leaving their
+through rows behind.
+
+Only the rows of the archived model are held to older_than_days. Whatever
+cascades from them goes with them whatever its own deleted_at, since a
+child can't be restored without its parent; the dry-run report counts
+those rows under 'cascaded' as well.
+"""
+import time
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+from core.models import SoftDeleteModel, bulk_changed
+
+# Processed in order: order details go first so the products they protect
+# can follow in the same run
+ARCHIVE_MODELS = getattr(settings, 'ARCHIVE_MODELS', [
+    'orders.OrderDetail',
+    'orders.CartItem',
+    'orders.Coupon',
+    'products.Product',
+    'core.MenuList',
+])
+# Plain (not soft-deleted) rows that are only history of their parent and
+# move to the archive with it
+ARCHIVE_CASCADE_MODELS = getattr(settings, 'ARCHIVE_CASCADE_MODELS', [
+    'products.InventoryLog',
+    'products.ProductViewDaily',
+])
+ARCHIVE_AFTER_DAYS = getattr(settings, 'ARCHIVE_AFTER_DAYS', 90)
+ARCHIVE_BATCH_SIZE = getattr(settings, 'ARCHIVE_BATCH_SIZE', 500)
+ARCHIVE_BATCH_SLEEP = getattr(settings, 'ARCHIVE_BATCH_SLEEP', 0.1)
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+
+def archive_table_name(model):
+    return f'{model._meta.db_table}_archive'
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _column_definition(field):
+    return f'{connection.ops.quote_name(field.column)} {field.db_type(connection)} NULL'
+
+
+def ensure_archive_table(model):
+    table = archive_table_name(model)
+    qn = connection.ops.quote_name
+    fields = model._meta.concrete_fields
+
+    with connection.cursor() as cursor:
+        if table not in connection.introspection.table_names(cursor):
+            columns = [_column_definition(field) for field in fields]
+            columns.append(f"{qn('archived_at')} {models.DateTimeField().db_type(connection)} NULL")
+            cursor.execute(f"CREATE TABLE {qn(table)} ({', '.join(columns)})")
+            return
+
+        existing = {column.name for column in connection.introspection.get_table_description(cursor, table)}
+        for field in fields:
+            if field.column not in existing:
+                cursor.execute(f"ALTER TABLE {qn(table)} ADD COLUMN {_column_definition(field)}")
+
+
+def _reverse_relations(model):
+    for rel in model._meta.related_objects:
+        if rel.one_to_many or rel.one_to_one:
+            yield rel
+
+
+def _is_soft_delete(model):
+    return issubclass(model, SoftDeleteModel)
+
+
+def _cascades(rel):
+    """Whether rows of rel can move to the archive with the row they point at."""
+    return rel.on_delete is models.CASCADE and (
+        _is_soft_delete(rel.related_model) or rel.related_model._meta.label in ARCHIVE_CASCADE_MODELS
+    )
+
+
+def check_archivable(model, seen=None):
+    """Raise ValueError if model, or anything that would move with it, has many-to-many relations."""
+    seen = seen or set()
+    if model in seen:
+        return
+    seen.add(model)
+    if model._meta.many_to_many or any(rel.many_to_many for rel in model._meta.related_objects):
+        raise ValueError(f"{model._meta.label} has many-to-many relations and can't be archived")
+    for rel in _reverse_relations(model):
+        if _cascades(rel):
+            check_archivable(rel.related_model, seen)
+
+
+def _referrers(rel, pks, *fields):
+    """Return [(referring pk, referenced pk, *fields)] for rows of rel pointing at pks."""
+    attname = rel.field.attname
+    manager = rel.related_model._base_manager
+    rows = []
+    for chunk in _chunks(pks):
+        rows.extend(manager.filter(**{f'{attname}__in': chunk}).values_list('pk', attname, *fields))
+    return rows
+
+
+def blocked_pks(model, pks):
+    """Return the subset of pks that are still referenced by something in use."""
+    blocked = set()
+    if not pks:
+        return blocked
+
+    for rel in _reverse_relations(model):
+        if not _cascades(rel):
+            blocked.update(parent for _, parent in _referrers(rel, pks))
+            continue
+        if _is_soft_delete(rel.related_model):
+            rows = _referrers(rel, pks, 'is_active')
+            blocked.update(parent for _, parent, is_active in rows if is_active)
+            rows = [(child, parent) for child, parent, is_active in rows if not is_active]
+        else:
+            rows = _referrers(rel, pks)
+        child_blocked = blocked_pks(rel.related_model, [child for child, _ in rows])
+        blocked.update(parent for child, parent in rows if child in child_blocked)
+    return blocked
+
+
+def collect_rows(model, pks, collected):
+    """Add pks of model and everything that cascades from them to collected ({model: pks}), children first."""
+    if not pks:
+        return collected
+
+    for rel in _reverse_relations(model):
+        if rel.on_delete is models.CASCADE:
+            children = [child for child, _ in _referrers(rel, pks)]
+            collect_rows(rel.related_model, children, collected)
+    collected.setdefault(model, []).extend(pks)
+    return collected
+
+
+def move_rows(model, pks, archived_at):
+    """Insert pks of model into its archive table and delete them from the source table."""
+    ensure_archive_table(model)
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    pk_column = qn(model._meta.pk.column)
+    columns = ', '.join(qn(field.column) for field in model._meta.concrete_fields)
+
+    with connection.cursor() as cursor:
+        for chunk in _chunks(pks):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {qn(archive_table_name(model))} ({columns}, {qn('archived_at')}) "
+                f"SELECT {columns}, %s FROM {table} WHERE {pk_column} IN ({placeholders})",
+                [connection.ops.adapt_datetimefield_value(archived_at), *chunk],
+            )
+            cursor.execute(f"DELETE FROM {table} WHERE {pk_column} IN ({placeholders})", chunk)
+
+
+def archive_model(model, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE,
+                  sleep=ARCHIVE_BATCH_SLEEP, max_batches=None, dry_run=False):
+    """
+    Archive rows of model soft-deleted more than older_than_days ago.
+    Returns a report dict for the run.
+    """
+    check_archivable(model)
+    started = time.monotonic()
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    candidates = model._base_manager.filter(is_active=False, deleted_at__lt=cutoff).order_by('pk')
+    report = {
+        'model': model._meta.label,
+        'candidates': 0,
+        'archived': 0,
+        'blocked': 0,
+        'cascaded': {},
+        'batches': 0,
+        'seconds': 0.0,
+    }
+
+    changed = {}
+    last_pk = None
+    while max_batches is None or report['batches'] < max_batches:
+        batch = candidates if last_pk is None else candidates.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        last_pk = pks[-1]
+
+        with transaction.atomic():
+            blocked = blocked_pks(model, pks)
+            movable = [pk for pk in pks if pk not in blocked]
+            moved = collect_rows(model, movable, {})
+            if not dry_run:
+                archived_at = timezone.now()
+                for related_model, related_pks in moved.items():
+                    move_rows(related_model, related_pks, archived_at)
+
+        report['batches'] += 1
+        report['candidates'] += len(pks)
+        report['blocked'] += len(blocked)
+        report['archived'] += len(movable)
+        for related_model, moved_pks in moved.items():
+            label = related_model._meta.label
+            # Self-referencing children (child menus) count as cascaded too
+            cascaded = len(moved_pks) - (len(movable) if related_model is model else 0)
+            if cascaded:
+                report['cascaded'][label] = report['cascaded'].get(label, 0) + cascaded
+            if not dry_run:
+                changed.setdefault(label, []).extend(moved_pks)
+
+        if len(pks) < batch_size:
+            break
+        if sleep:
+            time.sleep(sleep)
+
+    for label, pks in changed.items():
+        bulk_changed.send(sender=apps.get_model(label), pks=pks)
+
+    report['seconds'] = round(time.monotonic() - started, 3)
+    return report
+
+
+def archive_soft_deleted(model_labels=None, **options):
+    return [archive_model(apps.get_model(label), **options) for label in model_labels or ARCHIVE_MODELS]
@@ -0,0 +1,101 @@
+import atexit
+import logging
+import threading
+import time
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Keyed in-process buffer for writes that can be coalesced. Adding an item
+    for a key that is already pending replaces it (see merge), and the whole
+    buffer is written in one batch once flush_interval seconds have passed or
+    max_size keys are pending. A daemon thread, started on the first add,
+    flushes items that have waited flush_interval seconds even if no further
+    add comes along. Subclasses implement write(items), which gets
+    {key: value} and returns the number of rows it wrote.
+    """
+
+    def __init__(self, flush_interval=30, max_size=1000):
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._timer = None
+        self._stats = {
+            'received': 0,
+            'coalesced': 0,
+            'flushes': 0,
+            'rows_written': 0,
+            'errors': 0,
+        }
+        atexit.register(self.flush)
+
+    def merge(self, old, new):
+        return new
+
+    def write(self, items):
+        raise NotImplementedError
+
+    def add(self, key, value):
+        with self._lock:
+            self._stats['received'] += 1
+            if key in self._pending:
+                self._stats['coalesced'] += 1
+                value = self.merge(self._pending[key], value)
+            self._pending[key] = value
+            if self.flush_interval > 0 and not (self._timer and self._timer.is_alive()):
+                # Checked on every add rather than once so forked workers start their own
+                self._timer = threading.Thread(target=self._run_timer, name=f'{type(self).__name__}-flush', daemon=True)
+                self._timer.start()
+            due = (
+                len(self._pending) >= self.max_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def _run_timer(self):
+        while True:
+            with self._lock:
+                pending = bool(self._pending)
+                wait = self.flush_interval - (time.monotonic() - self._last_flush)
+            if pending and wait <= 0:
+                self.flush()
+                # This thread's connection would otherwise stay open between flushes
+                connections.close_all()
+            else:
+                time.sleep(wait if pending else self.flush_interval)
+
+    def discard(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def flush(self):
+        with self._lock:
+            items, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not items:
+            return 0
+
+        try:
+            written = self.write(items)
+        except Exception:
+            logger.exception("%s flush failed, dropped %d items", type(self).__name__, len(items))
+            with self._lock:
+                self._stats['errors'] += 1
+            return 0
+
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['rows_written'] += written
+        return written
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
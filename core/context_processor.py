@@ -1,35 +1,116 @@
+import hashlib
+from django.core.cache import cache
+from django.urls import NoReverseMatch, reverse
 from accounts.models import Profile
 from django.contrib.auth.models import User
 from accounts.models import UserPermission
 from .models import MenuList
-from .permissions import CheckUserPermission
+from .permissions import PERMISSION_CACHE_TIMEOUT, get_permission_version, get_permission_set
 from products.models import Wishlist
 
+MENU_ACTIONS = ('can_view', 'can_create', 'can_update', 'can_delete')
+
+
+def _menu_href(url_name):
+    try:
+        return reverse(url_name)
+    except NoReverseMatch:
+        return None
+
+
+def get_menu_tree(version=None):
+    """
+    Return the active MenuList rows as a parent/children tree of plain dicts,
+    built once per permission version and shared through the cache. href is
+    set for the rows that are pages (urls that reverse without arguments);
+    the rest are permission-only actions and stay out of the sidebar.
+    """
+    version = version or get_permission_version()
+    key = f'permissions:menu_tree:{version}'
+    tree = cache.get(key)
+    if tree is not None:
+        return tree
+
+    nodes = {}
+    for menu in MenuList.objects.all():
+        nodes[menu.pk] = {
+            'name': menu.menu_name,
+            'url': menu.menu_url,
+            'href': _menu_href(menu.menu_url),
+            'icon': menu.menu_icon,
+            'module': menu.module_name,
+            'type': menu.menu_type,
+            'parent_id': menu.parent_id,
+            'children': [],
+        }
+
+    tree = []
+    for node in nodes.values():
+        parent = nodes.get(node['parent_id'])
+        if parent:
+            parent['children'].append(node)
+        else:
+            tree.append(node)
+
+    cache.set(key, tree, PERMISSION_CACHE_TIMEOUT)
+    return tree
+
+
+def iter_menu_nodes(tree):
+    for node in tree:
+        yield node
+        yield from iter_menu_nodes(node['children'])
+
+
+def visible_menu_tree(tree, permissions):
+    """Prune the tree down to the nodes the user can view."""
+    visible = []
+    for node in tree:
+        base = node['url'].replace(":", "_")
+        children = visible_menu_tree(node['children'], permissions)
+        if permissions.get(f'can_view_{base}') or children:
+            visible.append({**node, 'children': children})
+    return visible
+
+
+def build_menu_context(tree, has_permission):
+    permissions = {}
+    for node in iter_menu_nodes(tree):
+        base = node['url'].replace(":", "_")
+        for action in MENU_ACTIONS:
+            permissions[f'{action}_{base}'] = has_permission(node['url'], action)
+    permissions['menu_tree'] = visible_menu_tree(tree, permissions)
+    return permissions
+
+
 def menu_permissions(request):
     if not request.user.is_authenticated:
         return {}
 
     user = request.user
-    permissions = {}
+
+    # Customers never see the dashboard menu; missing flags render as False
+    if not (user.is_superuser or user.is_staff):
+        return {}
+
+    version = get_permission_version()
+    tree = get_menu_tree(version)
 
     # Superuser gets everything
     if user.is_superuser:
-        for menu in MenuList.objects.all():
-            base = menu.menu_url.replace(":", "_")
-            permissions[f'can_view_{base}'] = True
-            permissions[f'can_create_{base}'] = True
-            permissions[f'can_update_{base}'] = True
-            permissions[f'can_delete_{base}'] = True
-        return permissions
-
-    # Staff: check permissions per menu
-    for menu in MenuList.objects.all().values_list('menu_url', flat=True):
-        base = menu.replace(":", "_")
-        permissions[f'can_view_{base}'] = CheckUserPermission(request, 'can_view', menu)
-        permissions[f'can_create_{base}'] = CheckUserPermission(request, 'can_create', menu)
-        permissions[f'can_update_{base}'] = CheckUserPermission(request, 'can_update', menu)
-        permissions[f'can_delete_{base}'] = CheckUserPermission(request, 'can_delete', menu)
+        key = f'permissions:flags:superuser:{version}'
+        has_permission = lambda url, action: True
+    # Staff: one flag dict per distinct permission mask
+    else:
+        permission_set = get_permission_set(request)
+        digest = hashlib.md5(hex(permission_set.mask).encode()).hexdigest()
+        key = f'permissions:flags:{version}:{digest}'
+        has_permission = permission_set.has
 
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = build_menu_context(tree, has_permission)
+        cache.set(key, permissions, PERMISSION_CACHE_TIMEOUT)
     return permissions
 
 
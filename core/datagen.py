@@ -0,0 +1,495 @@
+"""
+Synthetic catalog and traffic data for benchmarking.
+
+Everything is drawn from one random.Random(seed) and timestamped relative to
+a fixed anchor date, so the same seed, scale and anchor produce the same rows.
+Names, descriptions, images and people are recombined from the shapes in
+fixtures/, categories and brands are taken from the fixtures (created when
+missing), and rows are written with bulk_create in batches with explicit
+primary keys, so foreign keys can be filled in without reading rows back.
+Per-row save() and signals are skipped; bulk_changed is sent for every
+model at the end instead.
+"""
+import json
+import random
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+from core.models import bulk_changed
+
+User = get_user_model()
+
+FIXTURES_DIR = Path(settings.BASE_DIR) / 'fixtures'
+BENCHMARK_PASSWORD = 'benchmark'
+BENCHMARK_USER_PREFIX = 'bench'
+HISTORY_DAYS = 365
+
+DEFAULT_SCALE = {
+    'users': 1000,
+    'products': 10000,
+    'images_per_product': 3,
+    'variants_per_product': 2,
+    'inventory_logs_per_product': 2,
+    'wishlists': 5000,
+    'carts': 500,
+    'orders': 2000,
+    'views': 100000,
+}
+
+VARIANT_OPTIONS = {
+    'Size': ['XS', 'S', 'M', 'L', 'XL', 'XXL'],
+    'Color': ['Black', 'White', 'Red', 'Blue', 'Green', 'Grey', 'Silver'],
+    'Storage': ['64GB', '128GB', '256GB', '512GB', '1TB'],
+}
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (iPad; CPU OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1',
+]
+
+ORDER_STATUSES = ['pending', 'processing', 'shipped', 'delivered', 'delivered', 'delivered', 'cancelled']
+
+
+def load_fixture(name):
+    with open(FIXTURES_DIR / f'{name}.json') as fh:
+        return [dict(row['fields'], pk=row['pk']) for row in json.load(fh)]
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we set instead of stamping now()."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def next_id(model):
+    return (model._base_manager.aggregate(max_id=Max('pk'))['max_id'] or 0) + 1
+
+
+def reset_sequences(*models):
+    """Explicit primary keys don't advance Postgres sequences; SQLite needs nothing."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class CatalogGenerator:
+    def __init__(self, seed=42, batch_size=5000, anchor=None, log=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        anchor = anchor or timezone.now().date()
+        self.now = timezone.make_aware(datetime.combine(anchor, dt_time(12)))
+        self.log = log or (lambda message: None)
+        self.counts = Counter()
+
+        self.product_templates = load_fixture('products')
+        self.image_urls = sorted({row['image'] for row in load_fixture('productImages')})
+        self.people = load_fixture('users')
+        self.addresses = load_fixture('profile')
+
+        self.user_ids = []
+        self.product_ids = None
+        self.product_prices = array('l')
+
+    # helpers
+
+    def timestamp(self, max_days=HISTORY_DAYS, skew=1.0):
+        """A time in the max_days before the anchor; skew > 1 favours recent times."""
+        return self.now - timedelta(seconds=int(max_days * 86400 * self.rng.random() ** skew))
+
+    def popular_product(self):
+        """Pick a product with a long-tail popularity curve: low ids are viewed most."""
+        index = int(len(self.product_ids) * self.rng.random() ** 3)
+        return self.product_ids[index], self.product_prices[index]
+
+    def write(self, model, rows):
+        if rows:
+            model._base_manager.bulk_create(rows, batch_size=self.batch_size)
+            self.counts[model._meta.label] += len(rows)
+        return []
+
+    def batched(self, model, source):
+        """Write the rows yielded by source (None entries are skipped) in batch_size chunks."""
+        started = time.monotonic()
+        rows = []
+        for row in source:
+            if row is None:
+                continue
+            rows.append(row)
+            if len(rows) >= self.batch_size:
+                rows = self.write(model, rows)
+        self.write(model, rows)
+        self.log(f"{model._meta.label}: {self.counts[model._meta.label]} rows in {time.monotonic() - started:.1f}s")
+
+    # taxonomy
+
+    def ensure_taxonomy(self):
+        from products.models import Brand, ProductMainCategory, ProductSubCategory
+
+        main_rows = load_fixture('mainCategory')
+        ProductMainCategory._base_manager.bulk_create([
+            ProductMainCategory(name=row['name'], slug=row['slug'], image=row['image'],
+                                description=row['description'], cat_ordering=i)
+            for i, row in enumerate(main_rows)
+        ], ignore_conflicts=True)
+        main_ids = dict(ProductMainCategory._base_manager.values_list('name', 'pk'))
+        main_by_fixture_pk = {row['pk']: main_ids[row['name']] for row in main_rows}
+
+        ProductSubCategory._base_manager.bulk_create([
+            ProductSubCategory(name=row['name'], slug=row['slug'], image=row['image'],
+                               main_category_id=main_by_fixture_pk[row['main_category']], sub_cat_ordering=i)
+            for i, row in enumerate(load_fixture('subCategory'))
+        ], ignore_conflicts=True)
+        Brand._base_manager.bulk_create([
+            Brand(name=row['name'], image=row['image'], description=row['description'])
+            for row in load_fixture('Brand')
+        ], ignore_conflicts=True)
+
+        self.categories = sorted(ProductMainCategory.objects.values_list('pk', 'name'))
+        self.subcategories = {}
+        for pk, main_id in sorted(ProductSubCategory.objects.values_list('pk', 'main_category_id')):
+            self.subcategories.setdefault(main_id, []).append(pk)
+        self.brands = sorted(Brand.objects.values_list('pk', 'name'))
+
+    # users
+
+    def generate_users(self, total):
+        from accounts.models import Profile
+
+        first_id = next_id(User)
+        self.user_ids = list(range(first_id, first_id + total))
+        password = make_password(BENCHMARK_PASSWORD, salt='benchmark')
+
+        def user(i):
+            person = self.rng.choice(self.people)
+            joined = self.timestamp(skew=0.7)
+            return User(
+                id=first_id + i,
+                username=f'{BENCHMARK_USER_PREFIX}{first_id + i}',
+                password=password,
+                first_name=person['first_name'],
+                last_name=person['last_name'],
+                email=f'{BENCHMARK_USER_PREFIX}{first_id + i}@example.com',
+                date_joined=joined,
+                last_login=joined + timedelta(days=self.rng.randint(0, 30)),
+            )
+
+        def profile(i):
+            address = self.rng.choice(self.addresses)
+            return Profile(
+                user_id=first_id + i,
+                phone=f'555-{first_id + i:07d}',
+                address=f"{self.rng.randint(1, 9999)} {address['address'].split(' ', 1)[-1]}",
+                city=address['city'],
+                state=address['state'],
+                country=address['country'],
+                zipcode=address['zipcode'],
+                profile_pic=address['profile_pic'],
+            )
+
+        self.batched(User, (user(i) for i in range(total)))
+        self.batched(Profile, (profile(i) for i in range(total)))
+        reset_sequences(User)
+
+    # catalog
+
+    def generate_products(self, total):
+        from products.models import Product
+
+        first_id = next_id(Product)
+        self.product_ids = range(first_id, first_id + total)
+
+        def product(i):
+            pk = first_id + i
+            template = self.rng.choice(self.product_templates)
+            category_id, category_name = self.rng.choice(self.categories)
+            brand_id, brand_name = self.rng.choice(self.brands)
+            sub_ids = self.subcategories.get(category_id)
+            name = f"{brand_name} {template['name']} {pk}"[:100]
+            price = Decimal(self.rng.randint(500, 250000)) / 100
+            discount = self.rng.choice([0, 0, 0, 0, 5, 10, 15, 20, 25, 40])
+            discount_price = (price * (100 - discount) / 100).quantize(Decimal('0.01')) if discount else None
+            quantity = self.rng.choice([0, self.rng.randint(1, 500), self.rng.randint(1, 500), self.rng.randint(1, 500)])
+            created = self.timestamp(skew=0.8)
+            self.product_prices.append(int((discount_price or price) * 100))
+            return Product(
+                id=pk,
+                name=name,
+                slug=slugify(name)[:150],
+                main_category_id=category_id,
+                sub_category_id=self.rng.choice(sub_ids) if sub_ids else None,
+                brand_id=brand_id,
+                price=price,
+                sale_price=discount_price,
+                quantity=quantity,
+                stock=quantity,
+                sku=f"{category_name[:3].upper()}-{brand_name[:4].upper()}-{pk}",
+                is_featured=self.rng.random() < 0.02,
+                discount_percentage=discount,
+                discount_price=discount_price,
+                description=template['description'],
+                meta_title=name,
+                meta_description=template['meta_description'],
+                meta_keywords=template['meta_keywords'],
+                is_active=self.rng.random() >= 0.03,
+                created_at=created,
+                updated_at=created,
+            )
+
+        self.batched(Product, (product(i) for i in range(total)))
+        reset_sequences(Product)
+
+    def generate_product_children(self, images_per_product, variants_per_product, logs_per_product):
+        from products.models import InventoryLog, Product, ProductImage, ProductVariant
+
+        def per_product(count):
+            def product_and_slot(i):
+                return self.product_ids[i // count], i % count
+            return product_and_slot
+
+        product_for_image = per_product(images_per_product)
+        primary_urls = {}
+
+        def image(i):
+            product_id, slot = product_for_image(i)
+            created = self.timestamp(skew=0.8)
+            url = self.rng.choice(self.image_urls)
+            if slot == 0:
+                primary_urls[product_id] = url
+            return ProductImage(
+                product_id=product_id,
+                image=url,
+                is_primary=slot == 0,
+                created_at=created,
+                updated_at=created,
+            )
+
+        variant_names = sorted(VARIANT_OPTIONS)
+
+        def variants_for(product_id):
+            # Distinct (name, value) pairs, drawn once per product
+            kind = variant_names[product_id % len(variant_names)]
+            values = self.rng.sample(VARIANT_OPTIONS[kind], min(variants_per_product, len(VARIANT_OPTIONS[kind])))
+            return [(kind, value) for value in values]
+
+        def variant_rows():
+            for product_id in self.product_ids:
+                for kind, value in variants_for(product_id):
+                    created = self.timestamp(skew=0.8)
+                    yield ProductVariant(
+                        product_id=product_id,
+                        variant_name=kind,
+                        value=value,
+                        price_difference=Decimal(self.rng.choice([0, 0, 5, 10, 25, 50])),
+                        created_at=created,
+                        updated_at=created,
+                    )
+
+        product_for_log = per_product(logs_per_product)
+
+        def inventory_log(i):
+            product_id, slot = product_for_log(i)
+            created = self.timestamp(skew=0.5)
+            return InventoryLog(
+                product_id=product_id,
+                change_type='in' if slot == 0 or self.rng.random() < 0.4 else 'out',
+                quantity=self.rng.randint(1, 200),
+                remarks='Synthetic stock movement',
+                created_at=created,
+                updated_at=created,
+            )
+
+        total_products = len(self.product_ids)
+        if images_per_product:
+            self.batched(ProductImage, (image(i) for i in range(total_products * images_per_product)))
+            # Fixture images are absolute URLs, so they are also the resolved primary_image_url
+            products = [Product(id=product_id, primary_image_url=url) for product_id, url in primary_urls.items()]
+            for start in range(0, len(products), self.batch_size):
+                Product._base_manager.bulk_update(products[start:start + self.batch_size], ['primary_image_url'])
+        if variants_per_product:
+            self.batched(ProductVariant, variant_rows())
+        if logs_per_product:
+            self.batched(InventoryLog, (inventory_log(i) for i in range(total_products * logs_per_product)))
+
+    # shopping activity
+
+    def generate_wishlists(self, total):
+        from products.models import Wishlist
+
+        seen = set()
+
+        def wishlist(i):
+            pair = (self.rng.choice(self.user_ids), self.popular_product()[0])
+            if pair in seen:
+                return None
+            seen.add(pair)
+            created = self.timestamp(skew=1.5)
+            return Wishlist(user_id=pair[0], product_id=pair[1], created_at=created, updated_at=created)
+
+        self.batched(Wishlist, (wishlist(i) for i in range(total)))
+
+    def generate_carts(self, total):
+        from orders.models import Cart, CartItem
+
+        first_id = next_id(Cart)
+        cart_users = self.rng.sample(self.user_ids, min(total, len(self.user_ids)))
+
+        def cart(i):
+            created = self.timestamp(max_days=30, skew=1.5)
+            return Cart(id=first_id + i, user_id=cart_users[i], created_at=created, updated_at=created)
+
+        def cart_items():
+            for i in range(len(cart_users)):
+                products = {}
+                for _ in range(self.rng.randint(1, 5)):
+                    product_id, price = self.popular_product()
+                    products[product_id] = price
+                for product_id, price in products.items():
+                    created = self.timestamp(max_days=30, skew=1.5)
+                    yield CartItem(
+                        cart_id=first_id + i,
+                        product_id=product_id,
+                        quantity=self.rng.randint(1, 3),
+                        price=Decimal(price) / 100,
+                        created_at=created,
+                        updated_at=created,
+                    )
+
+        self.batched(Cart, (cart(i) for i in range(len(cart_users))))
+        self.batched(CartItem, cart_items())
+        reset_sequences(Cart)
+
+    def generate_orders(self, total):
+        from orders.models import Order, OrderDetail
+
+        first_id = next_id(Order)
+        details = []
+
+        def order(i):
+            pk = first_id + i
+            created = self.timestamp(skew=1.2)
+            amount = Decimal(0)
+            products = {}
+            for _ in range(self.rng.randint(1, 4)):
+                product_id, price = self.popular_product()
+                products[product_id] = price
+            for product_id, price in products.items():
+                quantity = self.rng.randint(1, 3)
+                unit_price = Decimal(price) / 100
+                amount += unit_price * quantity
+                details.append(OrderDetail(
+                    order_id=pk,
+                    product_id=product_id,
+                    unit_price=unit_price,
+                    quantity=quantity,
+                    total_price=unit_price * quantity,
+                    created_at=created,
+                    updated_at=created,
+                ))
+            status = self.rng.choice(ORDER_STATUSES)
+            shipping = Decimal(self.rng.choice([0, 60, 120]))
+            paid = status in ('shipped', 'delivered')
+            grand_total = amount + shipping
+            return Order(
+                id=pk,
+                order_number=f"{created:%Y%m}{pk:06d}{created:%d}",
+                customer_id=self.rng.choice(self.user_ids),
+                status=status,
+                paid_status='paid' if paid else 'unpaid',
+                order_amount=amount,
+                shipping_charge=shipping,
+                grand_total=grand_total,
+                paid_amount=grand_total if paid else 0,
+                due_amount=0 if paid else grand_total,
+                created_at=created,
+                updated_at=created,
+            )
+
+        # Orders are written in chunks so the matching details never pile up
+        for start in range(0, total, self.batch_size):
+            count = min(self.batch_size, total - start)
+            self.write(Order, [order(start + i) for i in range(count)])
+            details = self.write(OrderDetail, details)
+        self.log(f"orders.Order: {self.counts['orders.Order']} rows, "
+                 f"orders.OrderDetail: {self.counts['orders.OrderDetail']} rows")
+        reset_sequences(Order)
+
+    def generate_views(self, total):
+        from products.models import Product, ProductView
+
+        viewed = Counter()
+
+        def view(i):
+            product_id, _ = self.popular_product()
+            viewed[product_id] += 1
+            logged_in = self.user_ids and self.rng.random() < 0.3
+            return ProductView(
+                product_id=product_id,
+                user_id=self.rng.choice(self.user_ids) if logged_in else None,
+                session_key=f'{self.rng.getrandbits(128):032x}',
+                ip_address=f'10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}',
+                user_agent=self.rng.choice(USER_AGENTS),
+                created_at=self.timestamp(max_days=180, skew=1.5),
+            )
+
+        self.batched(ProductView, (view(i) for i in range(total)))
+
+        # Keep the denormalized counter in line with the rows just written
+        products = [Product(id=product_id, total_views=count) for product_id, count in viewed.items()]
+        for start in range(0, len(products), self.batch_size):
+            Product._base_manager.bulk_update(products[start:start + self.batch_size], ['total_views'])
+
+    def generate(self, users, products, images_per_product, variants_per_product,
+                 inventory_logs_per_product, wishlists, carts, orders, views):
+        from accounts.models import Profile
+        from orders.models import Cart, CartItem, Order, OrderDetail
+        from products.models import (
+            InventoryLog, Product, ProductImage, ProductVariant, ProductView, Wishlist,
+        )
+
+        models = [User, Profile, Product, ProductImage, ProductVariant, InventoryLog,
+                  Wishlist, Cart, CartItem, Order, OrderDetail, ProductView]
+        with manual_timestamps(*models), transaction.atomic():
+            self.ensure_taxonomy()
+            self.generate_users(users)
+            self.generate_products(products)
+            self.generate_product_children(images_per_product, variants_per_product, inventory_logs_per_product)
+            if self.product_ids and self.user_ids:
+                self.generate_wishlists(wishlists)
+                self.generate_carts(carts)
+                self.generate_orders(orders)
+            if self.product_ids:
+                self.generate_views(views)
+
+        for model in models:
+            if self.counts[model._meta.label]:
+                bulk_changed.send(sender=model)
+        return dict(self.counts)
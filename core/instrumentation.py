@@ -0,0 +1,188 @@
+"""
+Per-view query and timing statistics for QueryInstrumentationMiddleware.
+
+Each worker aggregates stats per resolved URL name in memory and every
+QUERY_STATS_FLUSH_INTERVAL seconds writes a snapshot to
+QUERY_STATS_DIR/<host>-<pid>.json, so the staff endpoint and the
+query_report command can merge the numbers from every worker.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+
+QUERY_STATS_DIR = Path(getattr(settings, 'QUERY_STATS_DIR', Path(settings.BASE_DIR) / 'var' / 'querystats'))
+QUERY_STATS_FLUSH_INTERVAL = getattr(settings, 'QUERY_STATS_FLUSH_INTERVAL', 60)
+QUERY_STATS_SLOWEST = getattr(settings, 'QUERY_STATS_SLOWEST', 5)
+
+_local = threading.local()
+
+
+class RequestRecorder:
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.sql_time += duration
+            self.statements.append((duration, sql))
+
+    def slowest(self, limit=QUERY_STATS_SLOWEST):
+        return sorted(self.statements, key=lambda item: item[0], reverse=True)[:limit]
+
+
+def current_recorder():
+    return getattr(_local, 'recorder', None)
+
+
+def set_recorder(recorder):
+    _local.recorder = recorder
+
+
+_template_timer_installed = False
+
+
+def install_template_timer():
+    """Time top-level template renders (render(), render_to_string()) for the active recorder."""
+    global _template_timer_installed
+    if _template_timer_installed:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        recorder = current_recorder()
+        if recorder is None or getattr(_local, 'rendering', False):
+            return original_render(self, context, request)
+        _local.rendering = True
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            _local.rendering = False
+            recorder.template_time += time.perf_counter() - start
+
+    Template.render = render
+    _template_timer_installed = True
+
+
+def _empty_entry():
+    return {
+        'requests': 0,
+        'queries': 0,
+        'max_queries': 0,
+        'sql_ms': 0.0,
+        'template_ms': 0.0,
+        'total_ms': 0.0,
+        'slowest': [],
+    }
+
+
+def merge_entry(entry, other):
+    entry['requests'] += other['requests']
+    entry['queries'] += other['queries']
+    entry['max_queries'] = max(entry['max_queries'], other['max_queries'])
+    entry['sql_ms'] += other['sql_ms']
+    entry['template_ms'] += other['template_ms']
+    entry['total_ms'] += other['total_ms']
+    slowest = entry['slowest'] + other['slowest']
+    entry['slowest'] = sorted(slowest, key=lambda item: item['ms'], reverse=True)[:QUERY_STATS_SLOWEST]
+    return entry
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._last_dump = time.monotonic()
+        self.snapshot_path = QUERY_STATS_DIR / f'{socket.gethostname()}-{os.getpid()}.json'
+
+    def record(self, view_name, recorder, total_time):
+        sample = {
+            'requests': 1,
+            'queries': recorder.queries,
+            'max_queries': recorder.queries,
+            'sql_ms': recorder.sql_time * 1000,
+            'template_ms': recorder.template_time * 1000,
+            'total_ms': total_time * 1000,
+            'slowest': [
+                {'ms': round(duration * 1000, 3), 'sql': sql[:500]}
+                for duration, sql in recorder.slowest()
+            ],
+        }
+        with self._lock:
+            merge_entry(self._views.setdefault(view_name, _empty_entry()), sample)
+            due = time.monotonic() - self._last_dump >= QUERY_STATS_FLUSH_INTERVAL
+            if due:
+                self._last_dump = time.monotonic()
+        if due:
+            self.dump()
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._views))
+
+    def dump(self):
+        snapshot = self.snapshot()
+        QUERY_STATS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(snapshot))
+        tmp_path.replace(self.snapshot_path)
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+
+query_stats = QueryStats()
+
+
+def load_query_stats(include_live=True):
+    """Merge every worker's snapshot (and this worker's live stats) into one {view_name: entry} dict."""
+    merged = {}
+    sources = []
+    if QUERY_STATS_DIR.exists():
+        for path in QUERY_STATS_DIR.glob('*.json'):
+            if include_live and path == query_stats.snapshot_path:
+                continue
+            try:
+                sources.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+    if include_live:
+        sources.append(query_stats.snapshot())
+
+    for views in sources:
+        for view_name, entry in views.items():
+            merge_entry(merged.setdefault(view_name, _empty_entry()), entry)
+    return merged
+
+
+def summarize(stats, order_by='sql_ms'):
+    rows = []
+    for view_name, entry in stats.items():
+        requests = entry['requests'] or 1
+        rows.append({
+            'view': view_name,
+            'requests': entry['requests'],
+            'avg_queries': round(entry['queries'] / requests, 1),
+            'max_queries': entry['max_queries'],
+            'avg_sql_ms': round(entry['sql_ms'] / requests, 2),
+            'avg_template_ms': round(entry['template_ms'] / requests, 2),
+            'avg_total_ms': round(entry['total_ms'] / requests, 2),
+            'sql_ms': round(entry['sql_ms'], 2),
+            'slowest': entry['slowest'],
+        })
+    return sorted(rows, key=lambda row: row.get(order_by, 0), reverse=True)
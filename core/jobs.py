@@ -0,0 +1,7 @@
+from .archive import archive_soft_deleted
+from .scheduler import register_job
+
+
+@register_job(interval=24 * 60 * 60, jitter=60 * 60, timeout=4 * 60 * 60)
+def archive_old_soft_deleted_rows():
+    return sum(report['archived'] for report in archive_soft_deleted())
@@ -0,0 +1,353 @@
+"""
+Load-test harness behind `manage.py loadtest`.
+
+N worker threads each replay weighted, scripted journeys (anonymous browse,
+login, add-to-cart, checkout, staff dashboard) either against the WSGI app
+in process, through django.test.Client, or against a running server over
+HTTP. Every request is timed and recorded under its URL name, and the run
+is summarised as p50/p95/p99 latency, requests per second and error rate
+per URL name, in a JSON document that compare_results() can diff against
+an earlier run.
+"""
+import html
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import parse_qs, urljoin
+from django.db import close_old_connections, connections
+from django.urls import reverse
+from .datagen import BENCHMARK_PASSWORD, BENCHMARK_USER_PREFIX
+
+SHIPPING_FORM = {
+    'full_name': 'Load Test',
+    'email': 'loadtest@example.com',
+    'phone': '555-0000000',
+    'address': '1 Benchmark Way',
+    'city': 'Dhaka',
+    'state': 'Dhaka',
+    'country': 'Bangladesh',
+    'zip': '1200',
+}
+
+# The storefront's "next page" link; its cursor carries the keyset position
+NEXT_PAGE_LINK = re.compile(rb'rel="next" href="\?([^"]*)"')
+
+
+def next_cursor(body):
+    match = NEXT_PAGE_LINK.search(body or b'')
+    if not match:
+        return None
+    return parse_qs(html.unescape(match.group(1).decode())).get('cursor', [None])[0]
+
+
+class InProcessTransport:
+    def __init__(self, host='localhost'):
+        from django.test import Client
+        self.client = Client(raise_request_exception=False, HTTP_HOST=host)
+
+    def request(self, method, path, data=None):
+        if method == 'POST':
+            response = self.client.post(path, data or {})
+        else:
+            response = self.client.get(path, data or {})
+        return response.status_code, response.content
+
+
+class HttpTransport:
+    def __init__(self, base_url, timeout=30):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def request(self, method, path, data=None):
+        url = urljoin(self.base_url, path)
+        if method == 'POST':
+            headers = {'X-CSRFToken': self.session.cookies.get('csrftoken', ''), 'Referer': url}
+            response = self.session.post(url, data=data or {}, headers=headers,
+                                         allow_redirects=False, timeout=self.timeout)
+        else:
+            response = self.session.get(url, params=data or {}, allow_redirects=False, timeout=self.timeout)
+        return response.status_code, response.content
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+class Session:
+    """One worker's view of the site: a transport plus the recorder its requests go to."""
+
+    def __init__(self, transport, recorder, rng):
+        self.transport = transport
+        self.recorder = recorder
+        self.rng = rng
+        self.last_body = None
+
+    def call(self, method, url_name, args=None, data=None, query=None):
+        path = reverse(url_name, args=args)
+        started = time.perf_counter()
+        try:
+            status, self.last_body = self.transport.request(method, path, data if method == 'POST' else query)
+            ok = status < 400
+        except Exception:
+            status, ok, self.last_body = None, False, None
+        self.recorder.record(url_name, time.perf_counter() - started, ok)
+        return status
+
+    def get(self, url_name, args=None, query=None):
+        return self.call('GET', url_name, args=args, query=query)
+
+    def post(self, url_name, data, args=None):
+        return self.call('POST', url_name, args=args, data=data)
+
+    def login(self, phone, password):
+        self.get('accounts:login')
+        return self.post('accounts:login', {'phone': phone, 'password': password})
+
+
+class Journeys:
+    """The scripted journeys; each takes a Session and the shared Targets."""
+
+    @staticmethod
+    def browse(session, targets):
+        session.get('home')
+        session.get('product_list')
+        # Page on the way a shopper does, through each page's next link
+        for _ in range(session.rng.randint(1, 4)):
+            cursor = next_cursor(session.last_body)
+            if not cursor:
+                break
+            session.get('product_list', query={'cursor': cursor})
+        for slug in targets.pick_slugs(session.rng, 2):
+            session.get('product_detail', args=[slug])
+
+    @staticmethod
+    def login(session, targets):
+        session.login(*targets.pick_customer(session.rng))
+        session.get('accounts:dashboard')
+        session.get('accounts:logout')
+
+    @staticmethod
+    def add_to_cart(session, targets):
+        session.login(*targets.pick_customer(session.rng))
+        for product_id, slug in targets.pick_products(session.rng, 2):
+            session.get('product_detail', args=[slug])
+            session.post('add_to_cart', {'product_id': product_id, 'quantity': 1})
+        session.get('get_cart')
+        session.get('accounts:logout')
+
+    @staticmethod
+    def checkout(session, targets):
+        session.login(*targets.pick_customer(session.rng))
+        product_id, slug = targets.pick_products(session.rng, 1)[0]
+        session.post('add_to_cart', {'product_id': product_id, 'quantity': 1})
+        session.get('checkout')
+        session.post('place_order', SHIPPING_FORM)
+        session.get('accounts:logout')
+
+    @staticmethod
+    def dashboard(session, targets):
+        session.login(*targets.pick_staff())
+        session.get('accounts:dashboard')
+        session.get('products:product_list')
+        session.get('order_list')
+        session.get('accounts:user_activity_list')
+        session.get('accounts:logout')
+
+
+JOURNEYS = {
+    'browse': Journeys.browse,
+    'login': Journeys.login,
+    'add_to_cart': Journeys.add_to_cart,
+    'checkout': Journeys.checkout,
+    'dashboard': Journeys.dashboard,
+}
+
+DEFAULT_MIX = {'browse': 60, 'login': 10, 'add_to_cart': 15, 'checkout': 10, 'dashboard': 5}
+
+
+class Targets:
+    """Products and accounts the journeys pick from, read once before the run."""
+
+    def __init__(self, product_limit=1000, customer_limit=500, customer_password=BENCHMARK_PASSWORD,
+                 customer_prefix=BENCHMARK_USER_PREFIX, staff=None):
+        from accounts.models import Profile
+        from products.models import Product
+
+        self.products = list(
+            Product.objects.order_by('-total_views', 'pk').values_list('pk', 'slug')[:product_limit]
+        )
+        self.customers = [
+            (phone, customer_password)
+            for phone in Profile.objects.filter(user__username__startswith=customer_prefix, user__is_active=True)
+            .order_by('pk').values_list('phone', flat=True)[:customer_limit]
+        ]
+        self.staff = staff
+        if not self.products:
+            raise ValueError("No active products to browse; run generate_benchmark_data first")
+
+    def pick_products(self, rng, count):
+        return rng.sample(self.products, min(count, len(self.products)))
+
+    def pick_slugs(self, rng, count):
+        return [slug for _, slug in self.pick_products(rng, count)]
+
+    def pick_customer(self, rng):
+        if not self.customers:
+            raise ValueError("No benchmark customers to log in as; run generate_benchmark_data first")
+        return rng.choice(self.customers)
+
+    def pick_staff(self):
+        if not self.staff:
+            raise ValueError("No staff login for the dashboard journey; pass --staff-phone and --staff-password")
+        return self.staff
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(recorder, elapsed):
+    def stats(latencies, errors):
+        values = sorted(latencies)
+        count = len(values)
+        return {
+            'requests': count,
+            'errors': errors,
+            'error_rate': round(errors / count, 4) if count else 0.0,
+            'rps': round(count / elapsed, 2) if elapsed else 0.0,
+            'mean_ms': round(1000 * sum(values) / count, 2) if count else 0.0,
+            'p50_ms': round(1000 * percentile(values, 50), 2),
+            'p95_ms': round(1000 * percentile(values, 95), 2),
+            'p99_ms': round(1000 * percentile(values, 99), 2),
+            'max_ms': round(1000 * values[-1], 2) if count else 0.0,
+        }
+
+    endpoints = {
+        name: stats(latencies, recorder.errors.get(name, 0))
+        for name, latencies in sorted(recorder.latencies.items())
+    }
+    everything = [value for latencies in recorder.latencies.values() for value in latencies]
+    return endpoints, stats(everything, sum(recorder.errors.values()))
+
+
+def run_load_test(workers=4, duration=30.0, iterations=None, mix=None, base_url=None, host='localhost',
+                  seed=1, warmup=0.0, targets=None):
+    """
+    Run the journey mix with workers threads for duration seconds (or
+    iterations journeys per worker) and return the result document.
+    Requests made during the first warmup seconds are not counted.
+    """
+    mix = dict(mix or DEFAULT_MIX)
+    unknown = set(mix) - set(JOURNEYS)
+    if unknown:
+        raise ValueError(f"Unknown journeys: {', '.join(sorted(unknown))}")
+    targets = targets or Targets()
+    if mix.get('dashboard') and not targets.staff:
+        if mix != DEFAULT_MIX:
+            targets.pick_staff()
+        # The default mix only runs the dashboard when there is someone to log in as
+        del mix['dashboard']
+    names, weights = zip(*sorted(mix.items()))
+
+    recorder = Recorder()
+    warmup_recorder = Recorder()
+    journeys_run = defaultdict(int)
+    journeys_lock = threading.Lock()
+    failures = []
+    started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = None if iterations else measure_from + duration
+
+    def worker(index):
+        rng = random.Random(f'{seed}-{index}')
+        transport = HttpTransport(base_url) if base_url else InProcessTransport(host)
+        session = Session(transport, warmup_recorder, rng)
+        count = 0
+        try:
+            while True:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+                if iterations is not None and count >= iterations:
+                    break
+                session.recorder = recorder if now >= measure_from else warmup_recorder
+                name = rng.choices(names, weights)[0]
+                try:
+                    JOURNEYS[name](session, targets)
+                except Exception as exc:
+                    failures.append(f'{name}: {exc!r}')
+                count += 1
+                with journeys_lock:
+                    journeys_run[name] += 1
+                if not base_url:
+                    close_old_connections()
+        finally:
+            if not base_url:
+                connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = max(time.monotonic() - measure_from, 0.001)
+
+    endpoints, total = summarize(recorder, elapsed)
+    return {
+        'meta': {
+            'mode': 'http' if base_url else 'in-process',
+            'target': base_url or host,
+            'workers': workers,
+            'duration_s': round(elapsed, 2),
+            'warmup_s': warmup,
+            'seed': seed,
+            'mix': dict(mix),
+            'journeys': dict(journeys_run),
+            'journey_failures': failures[:20],
+            'started_at': started_at,
+        },
+        'total': total,
+        'endpoints': endpoints,
+    }
+
+
+def load_results(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare_results(baseline, current, metrics=('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'error_rate')):
+    """Return per-URL-name rows of (baseline, current, % change) for each metric."""
+    rows = []
+    names = sorted(set(baseline['endpoints']) | set(current['endpoints']))
+    for name in names + ['TOTAL']:
+        before = baseline['total'] if name == 'TOTAL' else baseline['endpoints'].get(name)
+        after = current['total'] if name == 'TOTAL' else current['endpoints'].get(name)
+        row = {'endpoint': name}
+        for metric in metrics:
+            old = before.get(metric) if before else None
+            new = after.get(metric) if after else None
+            change = None
+            if old and new is not None:
+                change = round(100 * (new - old) / old, 1)
+            row[metric] = (old, new, change)
+        rows.append(row)
+    return rows
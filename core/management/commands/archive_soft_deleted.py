@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from core.archive import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_BATCH_SLEEP, ARCHIVE_MODELS, archive_soft_deleted,
+)
+
+
+class Command(BaseCommand):
+    help = "Move rows soft-deleted longer than --days ago into per-model archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help=f"Model labels (default: {', '.join(ARCHIVE_MODELS)})")
+        parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=ARCHIVE_BATCH_SLEEP, help="Seconds to pause between batches")
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop each model after this many batches")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would move without moving it")
+
+    def handle(self, *args, **options):
+        reports = archive_soft_deleted(
+            options['models'],
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+            max_batches=options['max_batches'],
+            dry_run=options['dry_run'],
+        )
+
+        verb = "would archive" if options['dry_run'] else "archived"
+        for report in reports:
+            self.stdout.write(
+                f"{report['model']}: {verb} {report['archived']} of {report['candidates']} "
+                f"({report['blocked']} still referenced) in {report['batches']} batches, {report['seconds']}s"
+            )
+            for label, count in report['cascaded'].items():
+                self.stdout.write(f"    + {count} {label}")
+
+        total = sum(report['archived'] for report in reports)
+        self.stdout.write(self.style.SUCCESS(f"Done: {verb} {total} rows"))
@@ -0,0 +1,30 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from core.datagen import BENCHMARK_PASSWORD, DEFAULT_SCALE, CatalogGenerator
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic catalog, customers and traffic at benchmark scale"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--anchor-date', type=date.fromisoformat, default=None,
+                            help="Date the generated history ends on (YYYY-MM-DD, default: today)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        for name, default in DEFAULT_SCALE.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+
+    def handle(self, *args, **options):
+        generator = CatalogGenerator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            anchor=options['anchor_date'],
+            log=self.stdout.write,
+        )
+        counts = generator.generate(**{name: options[name] for name in DEFAULT_SCALE})
+
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {total} rows (seed {options['seed']}, anchor {generator.now:%Y-%m-%d}); "
+            f"benchmark users log in with password '{BENCHMARK_PASSWORD}'"
+        ))
@@ -0,0 +1,85 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from core.loadtest import DEFAULT_MIX, Targets, compare_results, load_results, run_load_test
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        try:
+            mix[name.strip()] = int(weight or 1)
+        except ValueError:
+            raise CommandError(f"Bad journey weight: {part}")
+    return mix
+
+
+class Command(BaseCommand):
+    help = "Replay scripted journeys with concurrent workers and report latency percentiles per URL name"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to measure for")
+        parser.add_argument('--iterations', type=int, default=None,
+                            help="Journeys per worker; overrides --duration")
+        parser.add_argument('--warmup', type=float, default=0, help="Seconds of traffic to discard first")
+        parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                            help="Journey weights, e.g. browse=60,checkout=10 "
+                                 f"(default: {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())}; "
+                                 "dashboard is left out without --staff-phone)")
+        parser.add_argument('--url', default=None,
+                            help="Base URL of a running server, e.g. http://127.0.0.1:8000/ (default: in process)")
+        parser.add_argument('--host', default='localhost', help="Host header for in-process requests")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--staff-phone', default=None, help="Staff login for the dashboard journey")
+        parser.add_argument('--staff-password', default=None)
+        parser.add_argument('--output', default=None, help="Write the JSON results to this file")
+        parser.add_argument('--baseline', default=None, help="Earlier JSON results to compare against")
+
+    def handle(self, *args, **options):
+        staff = None
+        if options['staff_phone']:
+            staff = (options['staff_phone'], options['staff_password'] or '')
+
+        try:
+            results = run_load_test(
+                workers=options['workers'],
+                duration=options['duration'],
+                iterations=options['iterations'],
+                mix=options['mix'],
+                base_url=options['url'],
+                host=options['host'],
+                seed=options['seed'],
+                warmup=options['warmup'],
+                targets=Targets(staff=staff),
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2, sort_keys=True)
+
+        meta = results['meta']
+        self.stdout.write(f"{meta['mode']} against {meta['target']}: {meta['workers']} workers, "
+                          f"{meta['duration_s']}s, journeys {meta['journeys']}")
+        self.stdout.write(f"{'endpoint':<36} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for name, row in list(results['endpoints'].items()) + [('TOTAL', results['total'])]:
+            self.stdout.write(
+                f"{name:<36} {row['requests']:>7} {row['rps']:>8} {100 * row['error_rate']:>6.1f} "
+                f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}"
+            )
+        for failure in meta['journey_failures']:
+            self.stdout.write(self.style.WARNING(f"journey failed: {failure}"))
+
+        if options['baseline']:
+            self.stdout.write(f"\nChange against {options['baseline']} (p95 ms, rps, error rate):")
+            for row in compare_results(load_results(options['baseline']), results):
+                cells = []
+                for metric in ('p95_ms', 'rps', 'error_rate'):
+                    old, new, change = row[metric]
+                    cells.append(f"{old} -> {new}" + (f" ({change:+}%)" if change is not None else ""))
+                self.stdout.write(f"{row['endpoint']:<36} " + "   ".join(cells))
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,37 @@
+import statistics
+from django.core.management.base import BaseCommand
+from core.profiling import PROFILING_DIR, find_profiles, hot_functions, merge_profiles
+
+
+class Command(BaseCommand):
+    help = "Merge request profiles from every worker into a ranked hot-function table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', help="Only profiles for this URL name (e.g. home, products:product_list)")
+        parser.add_argument('--min-latency', type=int, default=0, help="Only profiles slower than this many ms")
+        parser.add_argument('--sort', default='tottime', choices=['tottime', 'cumtime', 'calls'])
+        parser.add_argument('--limit', type=int, default=30)
+        parser.add_argument('--output', help="Also write the merged stats to this .prof file")
+
+    def handle(self, *args, **options):
+        profiles = find_profiles(options['view'], options['min_latency'])
+        if not profiles:
+            self.stdout.write(f"No matching profiles in {PROFILING_DIR}")
+            return
+
+        latencies = [info['latency_ms'] for _, info in profiles]
+        views = sorted({info['view'] for _, info in profiles})
+        self.stdout.write(
+            f"{len(profiles)} profiles from {len({info['pid'] for _, info in profiles})} workers "
+            f"({', '.join(views)}); latency median {statistics.median(latencies)}ms, max {max(latencies)}ms"
+        )
+
+        stats = merge_profiles(path for path, _ in profiles)
+        if options['output']:
+            stats.dump_stats(options['output'])
+
+        self.stdout.write(f"{'calls':>10} {'tottime':>9} {'cumtime':>9} {'%':>6}  function")
+        for row in hot_functions(stats, options['sort'], options['limit']):
+            self.stdout.write(
+                f"{row['calls']:>10} {row['tottime']:>9.4f} {row['cumtime']:>9.4f} {row['percent']:>6}  {row['function']}"
+            )
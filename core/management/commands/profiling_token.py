@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from core.profiling import PROFILING_ENABLED, PROFILING_QUERY_PARAM, PROFILING_TOKEN_MAX_AGE, make_profile_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed token that makes ProfilingMiddleware profile a request"
+
+    def handle(self, *args, **options):
+        if not PROFILING_ENABLED:
+            self.stderr.write(self.style.WARNING("PROFILING_ENABLED is off; the server will ignore this token."))
+        token = make_profile_token()
+        self.stdout.write(token)
+        self.stderr.write(
+            f"Valid for {PROFILING_TOKEN_MAX_AGE}s. Send it as 'X-Profile: <token>' "
+            f"or append ?{PROFILING_QUERY_PARAM}=<token> to the URL."
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from core.instrumentation import QUERY_STATS_DIR, load_query_stats, summarize
+
+
+class Command(BaseCommand):
+    help = "Print per-view query counts and timings collected by QueryInstrumentationMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--order', default='sql_ms',
+                            choices=['sql_ms', 'avg_queries', 'max_queries', 'avg_total_ms', 'requests'])
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--statements', action='store_true', help="Also print the slowest statements per view")
+        parser.add_argument('--reset', action='store_true', help="Delete the collected snapshots afterwards")
+
+    def handle(self, *args, **options):
+        rows = summarize(load_query_stats(include_live=False), options['order'])[:options['limit']]
+        if not rows:
+            self.stdout.write(f"No query stats in {QUERY_STATS_DIR}")
+            return
+
+        self.stdout.write(
+            f"{'view':<45} {'reqs':>6} {'avg q':>7} {'max q':>6} {'avg sql':>9} {'avg tpl':>9} {'avg total':>10}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['view']:<45} {row['requests']:>6} {row['avg_queries']:>7} {row['max_queries']:>6} "
+                f"{row['avg_sql_ms']:>7}ms {row['avg_template_ms']:>7}ms {row['avg_total_ms']:>8}ms"
+            )
+            if options['statements']:
+                for statement in row['slowest']:
+                    self.stdout.write(f"    {statement['ms']:>8}ms  {statement['sql'][:150]}")
+
+        if options['reset']:
+            for path in QUERY_STATS_DIR.glob('*.json'):
+                path.unlink()
@@ -0,0 +1,58 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand, CommandError
+from core.models import ScheduledJob
+from core.scheduler import SCHEDULER_POLL_INTERVAL, autodiscover, get_jobs, run_due_jobs, run_forever
+
+
+class Command(BaseCommand):
+    help = "Run the periodic maintenance jobs registered in each app's jobs.py"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run whatever is due once and exit")
+        parser.add_argument('--list', action='store_true', help="List registered jobs and their last run")
+        parser.add_argument('--job', action='append', dest='jobs', default=[],
+                            help="With --once: only this job (repeatable)")
+        parser.add_argument('--force', action='store_true', help="With --once: run even if not due yet")
+        parser.add_argument('--poll', type=float, default=SCHEDULER_POLL_INTERVAL,
+                            help="Seconds between checks for due jobs")
+
+    def handle(self, *args, **options):
+        autodiscover()
+        if options['list']:
+            return self.list_jobs()
+
+        if options['once']:
+            try:
+                results = run_due_jobs(names=options['jobs'] or None, force=options['force'])
+            except KeyError as exc:
+                raise CommandError(exc.args[0])
+            for name, status, rows in results:
+                self.report(name, status, rows)
+            if not results:
+                self.stdout.write("Nothing due")
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop.set())
+        self.stdout.write(f"Scheduler running {len(get_jobs())} jobs, polling every {options['poll']}s")
+        run_forever(poll_interval=options['poll'], stop_event=stop, on_run=self.report)
+        self.stdout.write("Scheduler stopped")
+
+    def report(self, name, status, rows):
+        style = self.style.SUCCESS if status == 'ok' else self.style.ERROR
+        self.stdout.write(style(f"{name}: {status}, {rows} rows"))
+
+    def list_jobs(self):
+        state = ScheduledJob.objects.in_bulk(field_name='name')
+        for name, job in get_jobs().items():
+            row = state.get(name)
+            self.stdout.write(f"{name}  every {job.interval}s (+{job.jitter}s jitter)")
+            if row and row.last_finished_at:
+                self.stdout.write(
+                    f"    last {row.last_status} at {row.last_finished_at:%Y-%m-%d %H:%M:%S}, "
+                    f"{row.last_rows} rows in {row.last_duration_ms:.0f} ms; next {row.next_run_at:%Y-%m-%d %H:%M:%S}"
+                )
+            if row and row.locked_by:
+                self.stdout.write(f"    running on {row.locked_by} (lock until {row.locked_until:%H:%M:%S})")
@@ -0,0 +1,46 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from core.startup import startup_benchmark
+
+
+class Command(BaseCommand):
+    help = "Measure worker startup: import time per app and time to the first WSGI response"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to start (medians are reported)")
+        parser.add_argument('--path', default='/', help="Path of the first request")
+        parser.add_argument('--host', default='localhost', help="Host header of the first request")
+        parser.add_argument('--top', type=int, default=15, help="Third-party packages to list")
+        parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+
+    def handle(self, *args, **options):
+        try:
+            report = startup_benchmark(runs=options['runs'], path=options['path'], host=options['host'])
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        imports = report['imports_ms']
+        self.stdout.write(f"Median of {report['runs']} runs, first request GET {report['path']} -> {report['status']}")
+        self.stdout.write(f"  load WSGI app       {report['app_load_ms']:>8.1f} ms")
+        self.stdout.write(f"  first response      {report['first_response_ms']:>8.1f} ms")
+        self.stdout.write(f"  time to first byte  {report['time_to_first_response_ms']:>8.1f} ms")
+        self.stdout.write(f"  total import time   {sum(imports.values()):>8.1f} ms")
+
+        self.stdout.write("\nProject apps (import self time):")
+        for app in report['project_apps']:
+            self.stdout.write(f"  {app:<24} {imports.get(app, 0.0):>8.1f} ms")
+        self.stdout.write(f"\nTop {options['top']} other packages:")
+        others = [(name, ms) for name, ms in imports.items() if name not in report['project_apps']]
+        for name, ms in others[:options['top']]:
+            self.stdout.write(f"  {name:<24} {ms:>8.1f} ms")
+
+        if report['db_connections_during_startup']:
+            self.stdout.write(self.style.WARNING(
+                f"\n{report['db_connections_during_startup']} database connection(s) opened while importing the app"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("\nNo database access during startup"))
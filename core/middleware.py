@@ -1,5 +1,10 @@
-from accounts.models import UserActivity
-from django.utils.timezone import now
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from accounts.activity import record_activity
+from .instrumentation import RequestRecorder, install_template_timer, query_stats, set_recorder
+from .profiling import profiling_active, save_profile, should_profile, start_profiler
 
 class UserActivityMiddleware:
     def __init__(self, get_response):
@@ -9,9 +14,66 @@ class UserActivityMiddleware:
         response = self.get_response(request)
 
         if request.user.is_authenticated:
-            # Update only every X seconds instead of on every request
-            activity, created = UserActivity.objects.get_or_create(user=request.user)
-            if (now() - activity.last_activity).seconds > 30:  # update only every 30s
-                activity.update_activity(request)
+            # Heartbeats are buffered in memory and flushed in one bulk_update
+            # every USER_ACTIVITY_FLUSH_INTERVAL seconds
+            record_activity(request)
 
-        return response
\ No newline at end of file
+        return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Opt-in (QUERY_INSTRUMENTATION = True): records query count, SQL time,
+    template render time and the slowest statements per resolved URL name.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        install_template_timer()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = RequestRecorder()
+        set_recorder(recorder)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            set_recorder(None)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+        query_stats.record(view_name, recorder, time.perf_counter() - start)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Runs cProfile on sampled requests (PROFILING_SAMPLE_RATE) and, with
+    PROFILING_ENABLED, on requests carrying a signed X-Profile header or
+    ?_profile= flag. Not installed when both are off.
+    """
+    def __init__(self, get_response):
+        if not profiling_active():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+
+        profiler = start_profiler()
+        if profiler is None:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        save_profile(profiler, view_name, time.perf_counter() - start)
+        return response
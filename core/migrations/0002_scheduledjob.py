@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('next_run_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=255)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_duration_ms', models.FloatField(default=0)),
+                ('last_rows', models.IntegerField(default=0)),
+                ('last_status', models.CharField(blank=True, choices=[('ok', 'OK'), ('error', 'Error')], default='', max_length=10)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('run_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'scheduled_jobs',
+                'ordering': ['name'],
+            },
+        ),
+    ]
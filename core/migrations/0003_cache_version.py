@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_scheduledjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'cache_versions',
+                'ordering': ['name'],
+            },
+        ),
+    ]
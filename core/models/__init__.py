@@ -1,2 +1,4 @@
 from .base import *
-from .menu import *
\ No newline at end of file
+from .menu import *
+from .scheduler import *
+from .version import *
@@ -1,4 +1,5 @@
 from django.db import models
+from django.dispatch import Signal
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -11,7 +12,48 @@ class TimeStampedModel(models.Model):
     class Meta:
         abstract = True
 
-class ActiveManager(models.Manager):
+# Sent with sender=<model> after a queryset-level write (bulk soft delete,
+# restore, bulk load) that bypassed the per-row save/delete signals. pks lists
+# the rows touched; pks=None means any row may have changed.
+bulk_changed = Signal()
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    delete() is Django's own and removes rows; soft_delete() and restore()
+    flip is_active in one UPDATE and send bulk_changed with the pks they
+    touched. hard_delete() is delete() under a name that says so.
+    """
+
+    def soft_delete(self, user=None):
+        # Rows already deleted keep their deleted_at, so archiving isn't pushed back
+        fields = {'is_active': False, 'deleted_at': timezone.now()}
+        if user:
+            fields['deleted_by'] = user
+        return self._update_and_notify(self.filter(is_active=True), fields)
+
+    def restore(self):
+        return self._update_and_notify(
+            self.filter(is_active=False), {'is_active': True, 'deleted_at': None, 'deleted_by': None},
+        )
+
+    def _update_and_notify(self, queryset, fields):
+        # The pks are read first so receivers can refresh just those rows
+        pks = list(queryset.values_list('pk', flat=True))
+        count = queryset.update(**fields) if pks else 0
+        if pks:
+            bulk_changed.send(sender=self.model, pks=pks)
+        return count
+
+    def hard_delete(self):
+        return self.delete()
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    pass
+
+
+class ActiveManager(SoftDeleteManager):
     def get_queryset(self):
         return super().get_queryset().filter(is_active=True)
 
@@ -21,7 +63,7 @@ class SoftDeleteModel(models.Model):
     deleted_at = models.DateTimeField(null=True, blank=True)
     deleted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="%(class)s_deleted_by")
     objects = ActiveManager()
-    all_objects = models.Manager()
+    all_objects = SoftDeleteManager()
 
     class Meta:
         abstract = True
@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class ScheduledJob(models.Model):
+    """State of a periodic job registered with core.scheduler: its lock and last run."""
+    STATUS_CHOICES = (
+        ('ok', 'OK'),
+        ('error', 'Error'),
+    )
+
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    locked_by = models.CharField(max_length=255, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.FloatField(default=0)
+    last_rows = models.IntegerField(default=0)
+    last_status = models.CharField(max_length=10, choices=STATUS_CHOICES, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+    run_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'scheduled_jobs'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class CacheVersion(models.Model):
+    """Shared counter behind a versioned cache namespace; see core.versions."""
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'cache_versions'
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
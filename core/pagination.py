@@ -0,0 +1,123 @@
+"""
+Keyset (cursor) pagination.
+
+Paginator pages with COUNT(*) plus OFFSET, so every page pays for the whole
+result set and deep pages scan everything before them. KeysetPaginator
+instead remembers the sort key of the last (or first) row shown in a signed
+cursor and asks for the rows after (or before) it, so page 500 costs the
+same indexed range scan as page 1 and no count is run. Orderings always end
+in the primary key to make the key unique.
+
+Relevance-ordered search results have no stable column to key on; for those
+(ordering=None) the cursor carries an offset into the matches instead.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from django.core import signing
+from django.db.models import Q
+
+
+def _dump(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, next_token=None, previous_token=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_token = next_token if has_next else None
+        self.previous_token = previous_token if has_previous else None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering, per_page=12, salt='core.pagination'):
+        self.queryset = queryset
+        self.ordering = tuple(ordering) if ordering else None
+        self.per_page = per_page
+        self.salt = f"{salt}:{','.join(self.ordering or ('offset',))}"
+
+    def _field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def _encode(self, payload):
+        return signing.dumps(payload, salt=self.salt, compress=True)
+
+    def _decode(self, token):
+        # A tampered, stale or other-ordering cursor just restarts at page 1
+        if not token:
+            return None
+        try:
+            return signing.loads(token, salt=self.salt)
+        except signing.BadSignature:
+            return None
+
+    def _key(self, obj):
+        return [_dump(getattr(obj, 'pk' if name in ('id', 'pk') else name)) for name in self._field_names()]
+
+    def _seek(self, values, backwards):
+        """Rows strictly after values in this ordering (before them when backwards)."""
+        model = self.queryset.model
+        names = self._field_names()
+        values = [model._meta.get_field(name).to_python(value) for name, value in zip(names, values)]
+        seek = Q()
+        for position, field in enumerate(self.ordering):
+            descending = field.startswith('-') != backwards
+            step = Q(**{f"{names[position]}__{'lt' if descending else 'gt'}": values[position]})
+            for name, value in zip(names[:position], values[:position]):
+                step &= Q(**{name: value})
+            seek |= step
+        return seek
+
+    def page(self, token=None):
+        cursor = self._decode(token)
+        if self.ordering is None:
+            return self._offset_page(cursor)
+
+        queryset = self.queryset
+        backwards = bool(cursor) and cursor.get('d') == 'p'
+        if cursor:
+            queryset = queryset.filter(self._seek(cursor['k'], backwards))
+        if backwards:
+            flipped = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+            rows = list(queryset.order_by(*flipped)[:self.per_page + 1])
+            more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next, has_previous = True, more
+        else:
+            rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+            more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_next, has_previous = more, cursor is not None
+
+        if not rows:
+            # Nothing left on that side of the cursor (rows were deleted); start over
+            return self.page() if cursor else KeysetPage([], False, False)
+        return KeysetPage(
+            rows, has_next, has_previous,
+            next_token=self._encode({'d': 'n', 'k': self._key(rows[-1])}),
+            previous_token=self._encode({'d': 'p', 'k': self._key(rows[0])}),
+        )
+
+    def _offset_page(self, cursor):
+        offset = max(int((cursor or {}).get('o', 0)), 0)
+        rows = list(self.queryset[offset:offset + self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(
+            rows[:self.per_page], has_next, offset > 0,
+            next_token=self._encode({'o': offset + self.per_page}),
+            previous_token=self._encode({'o': max(offset - self.per_page, 0)}),
+        )
@@ -1,16 +1,102 @@
+from django.conf import settings
+from django.core.cache import cache
 from accounts.models import UserPermission
 from django.contrib.auth.models import User
+from .models import MenuList
+from .versions import bump_version, get_version
+
+PERMISSION_ACTIONS = ('can_view', 'can_create', 'can_update', 'can_delete', 'can_export')
+ACTION_BITS = {action: bit for bit, action in enumerate(PERMISSION_ACTIONS)}
+
+PERMISSION_VERSION_KEY = 'permissions:version'
+PERMISSION_CACHE_TIMEOUT = getattr(settings, 'PERMISSION_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_permission_version():
+    return get_version(PERMISSION_VERSION_KEY)
+
+
+def bump_permission_version():
+    return bump_version(PERMISSION_VERSION_KEY)
+
+
+def get_menu_index(version=None):
+    """
+    Return {menu_url: slot}. Each menu owns len(PERMISSION_ACTIONS) bits of a
+    user's permission mask, starting at slot * len(PERMISSION_ACTIONS).
+    """
+    version = version or get_permission_version()
+    key = f'permissions:menus:{version}'
+    menu_index = cache.get(key)
+    if menu_index is None:
+        urls = MenuList.all_objects.order_by('pk').values_list('menu_url', flat=True)
+        menu_index = {url: slot for slot, url in enumerate(urls)}
+        cache.set(key, menu_index, PERMISSION_CACHE_TIMEOUT)
+    return menu_index
+
+
+def compile_permission_mask(user, menu_index):
+    mask = 0
+    rows = UserPermission.objects.filter(
+        user=user,
+        is_active=True,
+    ).values_list('menu__menu_url', *PERMISSION_ACTIONS)
+
+    for menu_url, *flags in rows:
+        slot = menu_index.get(menu_url)
+        if slot is None:
+            continue
+        for bit, allowed in enumerate(flags):
+            if allowed:
+                mask |= 1 << (slot * len(PERMISSION_ACTIONS) + bit)
+    return mask
+
+
+def get_permission_mask(user, version=None):
+    version = version or get_permission_version()
+    key = f'permissions:mask:{version}:{user.pk}'
+    mask = cache.get(key)
+    if mask is None:
+        mask = compile_permission_mask(user, get_menu_index(version))
+        cache.set(key, mask, PERMISSION_CACHE_TIMEOUT)
+    return mask
+
+
+class PermissionSet:
+    """A user's compiled permission mask plus the menu index it was built against."""
+
+    def __init__(self, mask, menu_index):
+        self.mask = mask
+        self.menu_index = menu_index
+
+    def has(self, menu_url, action):
+        slot = self.menu_index.get(menu_url)
+        if slot is None or action not in ACTION_BITS:
+            return False
+        return bool(self.mask >> (slot * len(PERMISSION_ACTIONS) + ACTION_BITS[action]) & 1)
+
+
+def get_permission_set(request):
+    """
+    Return the current user's PermissionSet. It comes from the shared cache,
+    so steady-state checks never touch the database, and is memoized on the
+    request so every check in the same request shares it.
+    """
+    permission_set = getattr(request, '_permission_set', None)
+    if permission_set is not None:
+        return permission_set
+
+    version = get_permission_version()
+    permission_set = PermissionSet(
+        get_permission_mask(request.user, version),
+        get_menu_index(version),
+    )
+    request._permission_set = permission_set
+    return permission_set
+
 
 def CheckUserPermission(request, accessType, view_name):
     try:
-        user_permissions = {
-            'can_view': 'can_view',
-            'can_create': 'can_create',
-            'can_update': 'can_update',
-            'can_delete': 'can_delete',
-            'can_export': 'can_export',
-        }
-
         user = request.user
 
         # Superuser: Full access
@@ -18,15 +104,10 @@ def CheckUserPermission(request, accessType, view_name):
             return True
 
         if user.is_staff:
-            if accessType not in user_permissions:
+            if accessType not in ACTION_BITS:
                 return False
 
-            return UserPermission.objects.filter(
-                user=user,
-                is_active=True,
-                menu__menu_url=view_name,
-                **{user_permissions[accessType]: True}
-            ).exists()
+            return get_permission_set(request).has(view_name, accessType)
 
         return False
 
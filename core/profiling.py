@@ -0,0 +1,132 @@
+"""
+cProfile hook for live requests, used by ProfilingMiddleware.
+
+A request is profiled when PROFILING_ENABLED is on and it carries a valid
+signed token (X-Profile header or ?_profile= query flag, see `manage.py
+profiling_token`), or when it falls in the PROFILING_SAMPLE_RATE fraction.
+With neither, ProfilingMiddleware removes itself at startup. Profiles are written to PROFILING_DIR
+as <timestamp>-<url name>-<latency>ms-<pid>.prof, keeping the newest
+PROFILING_MAX_FILES, and `manage.py merge_profiles` ranks the hot functions
+across every worker's files.
+"""
+import cProfile
+import os
+import pstats
+import random
+import re
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core import signing
+
+PROFILING_ENABLED = getattr(settings, 'PROFILING_ENABLED', False)
+PROFILING_SAMPLE_RATE = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+PROFILING_DIR = Path(getattr(settings, 'PROFILING_DIR', Path(settings.BASE_DIR) / 'var' / 'profiles'))
+PROFILING_MAX_FILES = getattr(settings, 'PROFILING_MAX_FILES', 200)
+PROFILING_TOKEN_MAX_AGE = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 60 * 60)
+PROFILING_HEADER = 'HTTP_X_PROFILE'
+PROFILING_QUERY_PARAM = '_profile'
+
+TOKEN_SALT = 'core.profiling'
+FILENAME_RE = re.compile(r'^(?P<timestamp>\d+)-(?P<view>.+)-(?P<latency>\d+)ms-(?P<pid>\d+)\.prof$')
+
+
+def make_profile_token():
+    return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def token_is_valid(token):
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=PROFILING_TOKEN_MAX_AGE) == 'profile'
+    except signing.BadSignature:
+        return False
+
+
+def profiling_active():
+    return PROFILING_ENABLED or PROFILING_SAMPLE_RATE > 0
+
+
+def should_profile(request):
+    token = PROFILING_ENABLED and (request.META.get(PROFILING_HEADER) or request.GET.get(PROFILING_QUERY_PARAM))
+    if token:
+        return token_is_valid(token)
+    return PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE
+
+
+def start_profiler():
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active in this thread
+        return None
+    return profiler
+
+
+def save_profile(profiler, view_name, latency):
+    PROFILING_DIR.mkdir(parents=True, exist_ok=True)
+    safe_view = re.sub(r'[^A-Za-z0-9_.]+', '_', view_name)
+    path = PROFILING_DIR / f'{int(time.time() * 1000)}-{safe_view}-{int(latency * 1000)}ms-{os.getpid()}.prof'
+    profiler.dump_stats(path)
+    rotate_profiles()
+    return path
+
+
+def rotate_profiles(max_files=PROFILING_MAX_FILES):
+    profiles = sorted(PROFILING_DIR.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+    for path in profiles[:max(len(profiles) - max_files, 0)]:
+        path.unlink(missing_ok=True)
+
+
+def parse_profile_name(path):
+    match = FILENAME_RE.match(Path(path).name)
+    if not match:
+        return None
+    return {
+        'timestamp': int(match['timestamp']),
+        'view': match['view'],
+        'latency_ms': int(match['latency']),
+        'pid': int(match['pid']),
+    }
+
+
+def find_profiles(view=None, min_latency_ms=0):
+    if not PROFILING_DIR.exists():
+        return []
+    profiles = []
+    for path in sorted(PROFILING_DIR.glob('*.prof')):
+        info = parse_profile_name(path)
+        if info is None:
+            continue
+        if view and info['view'] != re.sub(r'[^A-Za-z0-9_.]+', '_', view):
+            continue
+        if info['latency_ms'] < min_latency_ms:
+            continue
+        profiles.append((path, info))
+    return profiles
+
+
+def merge_profiles(paths):
+    paths = [str(path) for path in paths]
+    if not paths:
+        return None
+    stats = pstats.Stats(paths[0])
+    for path in paths[1:]:
+        stats.add(path)
+    return stats
+
+
+def hot_functions(stats, sort='tottime', limit=30):
+    """Return the top functions of merged stats as dicts, ranked by tottime or cumtime."""
+    total = stats.total_tt or 1
+    rows = []
+    for (filename, line, function), (primitive_calls, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f'{filename}:{line}({function})',
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+            'percent': round(100 * tottime / total, 2),
+        })
+    return sorted(rows, key=lambda row: row[sort], reverse=True)[:limit]
@@ -0,0 +1,139 @@
+"""
+In-process periodic job scheduler run by `manage.py run_scheduler`.
+
+Apps register housekeeping functions in their jobs.py with @register_job.
+Each job has a ScheduledJob row. A node only runs a job after claiming that
+row with a conditional UPDATE: the job must be due and not locked by a live
+run. Any number of scheduler processes can therefore share a database
+without a broker, and each run still happens once. A job returns the number
+of rows it touched, which is stored with its duration and status. The next
+run is pushed out by the interval plus a random jitter so nodes don't
+stampede.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+from .models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_POLL_INTERVAL = getattr(settings, 'SCHEDULER_POLL_INTERVAL', 5)
+
+Job = namedtuple('Job', ['name', 'func', 'interval', 'jitter', 'timeout'])
+
+_registry = {}
+
+
+def register_job(interval, jitter=0, timeout=None, name=None):
+    """
+    Register the decorated function as a periodic job running every
+    interval seconds (plus up to jitter seconds). The lock is held for at
+    most timeout seconds (default: the interval, at least 5 minutes) so a
+    crashed node can't block the job forever.
+    """
+    def decorator(func):
+        job_name = name or f'{func.__module__}.{func.__name__}'
+        _registry[job_name] = Job(job_name, func, interval, jitter, timeout or max(interval, 300))
+        return func
+    return decorator
+
+
+def autodiscover():
+    autodiscover_modules('jobs')
+
+
+def get_jobs():
+    return dict(sorted(_registry.items()))
+
+
+def node_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _ensure_rows(jobs):
+    ScheduledJob.objects.bulk_create(
+        [ScheduledJob(name=name, next_run_at=timezone.now()) for name in jobs],
+        ignore_conflicts=True,
+    )
+
+
+def acquire(job, node, force=False):
+    """Claim the job for node; returns True only for the one node that wins."""
+    now = timezone.now()
+    claim = ScheduledJob.objects.filter(name=job.name).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+    if not force:
+        claim = claim.filter(Q(next_run_at__isnull=True) | Q(next_run_at__lte=now))
+    return claim.update(
+        locked_by=node,
+        locked_until=now + timedelta(seconds=job.timeout),
+        last_started_at=now,
+    ) == 1
+
+
+def run_job(job, node):
+    started = time.monotonic()
+    status, error, rows = 'ok', '', 0
+    try:
+        rows = job.func() or 0
+    except Exception:
+        status, error = 'error', traceback.format_exc()
+        logger.exception("Scheduled job %s failed", job.name)
+
+    finished = timezone.now()
+    delay = job.interval + random.uniform(0, job.jitter)
+    ScheduledJob.objects.filter(name=job.name, locked_by=node).update(
+        locked_by='',
+        locked_until=None,
+        last_finished_at=finished,
+        last_duration_ms=round((time.monotonic() - started) * 1000, 1),
+        last_rows=rows,
+        last_status=status,
+        last_error=error[-4000:],
+        next_run_at=finished + timedelta(seconds=delay),
+        run_count=F('run_count') + 1,
+        error_count=F('error_count') + (1 if status == 'error' else 0),
+    )
+    return status, rows
+
+
+def run_due_jobs(node=None, names=None, force=False):
+    """Run every registered job (or those in names) that is due and unlocked; returns [(name, status, rows)]."""
+    node = node or node_name()
+    jobs = get_jobs()
+    if names:
+        unknown = set(names) - set(jobs)
+        if unknown:
+            raise KeyError(f"Unknown jobs: {', '.join(sorted(unknown))}")
+        jobs = {name: jobs[name] for name in names}
+
+    _ensure_rows(jobs)
+    results = []
+    for job in jobs.values():
+        if acquire(job, node, force=force):
+            status, rows = run_job(job, node)
+            results.append((job.name, status, rows))
+    return results
+
+
+def run_forever(poll_interval=SCHEDULER_POLL_INTERVAL, stop_event=None, on_run=None):
+    node = node_name()
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        close_old_connections()
+        for result in run_due_jobs(node):
+            if on_run:
+                on_run(*result)
+        stop_event.wait(poll_interval)
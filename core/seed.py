@@ -0,0 +1,83 @@
+"""
+Bulk loader for the seed fixtures in fixtures/.
+
+Does what `loaddata` does for these files (rows keep their fixture pk and
+timestamps, existing rows with the same pk are overwritten) but with one
+upserting bulk_create per model and batch, in dependency order, inside a
+single transaction. Per-row save() and model signals are skipped (the
+primary image URLs they would maintain are recomputed at the end);
+bulk_changed is sent once per loaded model after the transaction commits.
+"""
+from django.core import serializers
+from django.db import transaction
+from core.models import bulk_changed
+from .datagen import FIXTURES_DIR, manual_timestamps, reset_sequences
+
+# Dependency order: every fixture only points at rows from the ones before it
+SEED_FIXTURES = [
+    'users',
+    'profile',
+    'menuList',
+    'Brand',
+    'mainCategory',
+    'subCategory',
+    'products',
+    'productImages',
+]
+
+
+def read_fixture(name, fixtures_dir=FIXTURES_DIR):
+    path = fixtures_dir / (name if name.endswith('.json') else f'{name}.json')
+    with open(path) as fh:
+        return list(serializers.deserialize('json', fh, ignorenonexistent=True))
+
+
+def bulk_upsert(model, instances, batch_size):
+    pk_name = model._meta.pk.name
+    update_fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+    model._base_manager.bulk_create(
+        instances,
+        batch_size=batch_size,
+        update_conflicts=bool(update_fields),
+        unique_fields=[pk_name],
+        update_fields=update_fields,
+    )
+
+
+def refresh_primary_images(groups):
+    # bulk_create skips ProductImage.save, which normally keeps Product.primary_image_url current
+    from products.models import Product, ProductImage
+    product_ids = set()
+    for model, deserialized in groups:
+        if model is Product:
+            product_ids.update(item.object.pk for item in deserialized)
+        elif model is ProductImage:
+            product_ids.update(item.object.product_id for item in deserialized)
+    if product_ids:
+        Product.backfill_primary_images(Product.all_objects.filter(pk__in=product_ids))
+
+
+def seed_fixtures(names=None, batch_size=1000, fixtures_dir=FIXTURES_DIR, log=None):
+    """Load the named fixtures (default SEED_FIXTURES) and return {model label: rows}."""
+    log = log or (lambda message: None)
+    groups = []
+    for name in names or SEED_FIXTURES:
+        by_model = {}
+        for deserialized in read_fixture(name, fixtures_dir):
+            by_model.setdefault(type(deserialized.object), []).append(deserialized)
+        groups.extend(by_model.items())
+
+    models = list(dict.fromkeys(model for model, _ in groups))
+    counts = {}
+    with manual_timestamps(*models), transaction.atomic():
+        for model, deserialized in groups:
+            bulk_upsert(model, [item.object for item in deserialized], batch_size)
+            for item in deserialized:
+                for field_name, values in (item.m2m_data or {}).items():
+                    getattr(item.object, field_name).set(values)
+            counts[model._meta.label] = counts.get(model._meta.label, 0) + len(deserialized)
+            log(f"{model._meta.label}: {len(deserialized)} rows")
+        reset_sequences(*models)
+        refresh_primary_images(groups)
+        transaction.on_commit(lambda: [bulk_changed.send(sender=model) for model in models])
+    return counts
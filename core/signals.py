@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import UserPermission
+from .models import MenuList, bulk_changed
+from .permissions import bump_permission_version
+
+
+@receiver(post_save, sender=UserPermission)
+@receiver(post_delete, sender=UserPermission)
+@receiver(post_save, sender=MenuList)
+@receiver(post_delete, sender=MenuList)
+@receiver(bulk_changed, sender=UserPermission)
+@receiver(bulk_changed, sender=MenuList)
+def invalidate_permission_cache(sender, **kwargs):
+    bump_permission_version()
@@ -0,0 +1,101 @@
+"""
+Worker startup measurements for `manage.py startup_benchmark`.
+
+Each run starts a fresh interpreter with -X importtime, loads the WSGI app
+the way a worker does and sends it one request. The child reports how long
+setup and the first response took and whether anything opened a database
+connection before the first request; its importtime log is rolled up per
+top-level package so each app's share of the import cost is visible.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from django.conf import settings
+
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+from django.db.backends.signals import connection_created
+connections_during_startup = []
+connection_created.connect(lambda sender, connection, **kwargs: connections_during_startup.append(connection.alias), weak=False)
+
+from ecomm_project.wsgi import application
+loaded = time.perf_counter()
+startup_connections = len(connections_during_startup)
+
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': sys.argv[2], 'SERVER_NAME': sys.argv[2]}
+setup_testing_defaults(environ)
+status = []
+response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+b''.join(response)
+if hasattr(response, 'close'):
+    response.close()
+answered = time.perf_counter()
+
+print(json.dumps({
+    'app_load_ms': (loaded - started) * 1000,
+    'first_response_ms': (answered - loaded) * 1000,
+    'time_to_first_response_ms': (answered - started) * 1000,
+    'status': status[0] if status else None,
+    'db_connections_during_startup': startup_connections,
+}))
+'''
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr):
+    """Return {top-level package: self time in ms} from a -X importtime log."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            totals[match[4].split('.')[0]] += int(match[1]) / 1000
+    return dict(totals)
+
+
+def run_probe(path='/', host='localhost'):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'ecomm_project.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, path, host],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode or not lines:
+        raise RuntimeError(f"startup probe failed:\n{result.stderr[-2000:]}")
+    timings = json.loads(lines[-1])
+    timings['imports'] = parse_importtime(result.stderr)
+    return timings
+
+
+def project_packages():
+    return [app.split('.')[0] for app in settings.INSTALLED_APPS if not app.startswith('django.')] + [
+        settings.ROOT_URLCONF.split('.')[0],
+    ]
+
+
+def startup_benchmark(runs=5, path='/', host='localhost'):
+    """Run the probe runs times and return medians of the timings and per-package import times."""
+    samples = [run_probe(path, host) for _ in range(runs)]
+    packages = set().union(*(sample['imports'] for sample in samples))
+    imports = {
+        package: statistics.median(sample['imports'].get(package, 0.0) for sample in samples)
+        for package in packages
+    }
+    report = {
+        'runs': runs,
+        'path': path,
+        'status': samples[-1]['status'],
+        'db_connections_during_startup': max(sample['db_connections_during_startup'] for sample in samples),
+        'imports_ms': dict(sorted(imports.items(), key=lambda item: item[1], reverse=True)),
+        'project_apps': list(dict.fromkeys(project_packages())),
+    }
+    for key in ('app_load_ms', 'first_response_ms', 'time_to_first_response_ms'):
+        report[key] = round(statistics.median(sample[key] for sample in samples), 1)
+    return report
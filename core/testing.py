@@ -0,0 +1,237 @@
+"""
+Query budgets for every named route, shared by the apps' tests.py.
+
+RouteQueryBudgetMixin walks the named routes of a urlconf as a logged-in
+superuser, first against a small seeded catalog and then after growing it,
+and fails when a route goes over its query or row budget, or when its query
+count grows with the catalog (the N+1 signature). Rows are counted by
+re-running each SELECT as SELECT COUNT(*), so they are the rows the
+statement returned, not the rows a queryset happened to iterate.
+"""
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from accounts.activity import activity_buffer
+from products.tracking import view_buffer
+from .datagen import CatalogGenerator
+from .versions import forget_versions
+
+User = get_user_model()
+
+ADMIN_PHONE = '555-9990001'
+ADMIN_PASSWORD = 'budget-admin'
+
+
+class QueryCounter:
+    """execute_wrapper counting statements and the rows each SELECT returns."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.statements = []
+        self._counting = False
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if self._counting:
+            return result
+        self.queries += 1
+        self.statements.append(sql)
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            self._counting = True
+            try:
+                with context['connection'].cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) FROM ({sql}) counted_rows', params)
+                    self.rows += cursor.fetchone()[0]
+            finally:
+                self._counting = False
+        return result
+
+
+def seed_catalog(products, seed=1):
+    """Add products (with images, variants, stock, views, orders) to the test database."""
+    return CatalogGenerator(seed=seed, batch_size=1000).generate(
+        users=max(products // 10, 2),
+        products=products,
+        images_per_product=2,
+        variants_per_product=2,
+        inventory_logs_per_product=2,
+        wishlists=products,
+        carts=max(products // 20, 1),
+        orders=products // 2,
+        views=products * 5,
+    )
+
+
+def iter_named_routes(urlconf):
+    """Yield (name, pattern) for the named routes defined directly in urlconf (includes are skipped)."""
+    module = import_module(urlconf)
+    namespace = getattr(module, 'app_name', None)
+    for pattern in module.urlpatterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            yield (f'{namespace}:{pattern.name}' if namespace else pattern.name), pattern
+
+
+class RouteQueryBudgetMixin:
+    """
+    Mix into a TestCase and set:
+
+    urlconfs        modules whose named routes are walked
+    budgets         {route name: (max queries, max rows)} at the large catalog
+    default_budget  budget for routes not listed in budgets
+    skip_routes     {route name: reason} for routes that can't be walked with a GET
+    growth_exempt   {route name: reason} for known per-row queries; these
+                    routes are held to their budget but may grow with the catalog
+    route_objects   {route name: {url kwarg: seeded object key}} where the
+                    default mapping in URL_KWARG_OBJECTS is ambiguous
+    """
+    urlconfs = []
+    budgets = {}
+    default_budget = (30, 500)
+    skip_routes = {}
+    growth_exempt = {}
+    route_objects = {}
+    small_catalog = 10
+    large_catalog = 1000
+
+    URL_KWARG_OBJECTS = {
+        'slug': ('product', 'slug'),
+        'product_id': ('product', 'pk'),
+        'brand_id': ('brand', 'pk'),
+        'category_id': ('category', 'pk'),
+        'sub_category_id': ('sub_category', 'pk'),
+        'image_id': ('image', 'pk'),
+        'user_id': ('customer', 'pk'),
+        'coupon_id': ('coupon', 'pk'),
+        'order_id': ('order', 'pk'),
+        'str_data': ('payment', 'transaction_id'),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        # Seeded users and the admin login don't need a slow hasher
+        hashers = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+        hashers.enable()
+        cls.addClassCleanup(hashers.disable)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        from accounts.models import Profile
+        from orders.models import Cart, CartItem, Coupon, OnlinePaymentRequest, Order
+
+        seed_catalog(cls.small_catalog)
+        cls.admin = User.objects.create_superuser('budget-admin', 'budget-admin@example.com', ADMIN_PASSWORD)
+        Profile.objects.create(user=cls.admin, phone=ADMIN_PHONE, address='1 Test Road', city='Dhaka',
+                               state='Dhaka', country='Bangladesh', zipcode='1200')
+
+        product = cls.pick_product()
+        # checkout needs something in the cart
+        cart = Cart.objects.create(user=cls.admin)
+        CartItem.objects.create(cart=cart, product=product, quantity=1, price=product.price)
+        order = Order.objects.filter(order_details__isnull=False).order_by('pk').first()
+        Order.objects.filter(pk=order.pk).update(customer=cls.admin, paid_status='paid', status='processing')
+        now = timezone.now()
+        cls.objects = {
+            'product': product,
+            'brand': product.brand,
+            'category': product.main_category,
+            'sub_category': product.sub_category,
+            'image': product.product_images.order_by('pk').first(),
+            'variant': product.variants.order_by('pk').first(),
+            'inventory_log': product.inventory_logs.order_by('pk').first(),
+            'customer': User.objects.filter(is_superuser=False).order_by('pk').first(),
+            'coupon': Coupon.objects.create(code='BUDGET10', discount_type='percent', discount_value=10,
+                                            valid_from=now, valid_to=now + timedelta(days=30)),
+            'order': order,
+            'payment': OnlinePaymentRequest.objects.create(order=order, transaction_id='budget-txn', amount=100,
+                                                           payment_status='Paid', created_by=cls.admin),
+        }
+
+    @classmethod
+    def pick_product(cls):
+        from products.models import Product
+        return Product.objects.filter(product_images__isnull=False, variants__isnull=False).order_by('pk').first()
+
+    def grow_catalog(self):
+        """Seed up to large_catalog products and give the admin a matching share of orders and wishlist."""
+        from orders.models import Order
+        from products.models import Product, Wishlist
+
+        seed_catalog(self.large_catalog - self.small_catalog, seed=2)
+        share = self.large_catalog // 20
+        order_ids = list(Order.objects.exclude(customer=self.admin).order_by('pk').values_list('pk', flat=True)[:share])
+        Order.objects.filter(pk__in=order_ids).update(customer=self.admin)
+        Wishlist.objects.bulk_create([
+            Wishlist(user=self.admin, product_id=product_id)
+            for product_id in Product.objects.order_by('pk').values_list('pk', flat=True)[:share]
+        ], ignore_conflicts=True)
+
+    def setUp(self):
+        super().setUp()
+        for buffer in (activity_buffer, view_buffer):
+            patcher = mock.patch.object(buffer, 'flush_interval', 10 ** 9)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.log_in()
+
+    def log_in(self):
+        response = self.client.post(reverse('accounts:login'), {'phone': ADMIN_PHONE, 'password': ADMIN_PASSWORD})
+        self.assertEqual(response.status_code, 302, "budget admin could not log in")
+
+    def routes(self):
+        for urlconf in self.urlconfs:
+            for name, pattern in iter_named_routes(urlconf):
+                if name not in self.skip_routes:
+                    yield name, pattern
+
+    def route_url(self, name, pattern):
+        kwargs = {}
+        for kwarg in pattern.pattern.converters:
+            key, attribute = self.URL_KWARG_OBJECTS.get(kwarg, (None, 'pk'))
+            key = self.route_objects.get(name, {}).get(kwarg, key)
+            kwargs[kwarg] = getattr(self.objects[key], attribute)
+        return reverse(name, kwargs=kwargs)
+
+    def measure(self, name, pattern):
+        """GET the route inside a rolled-back savepoint and return its QueryCounter."""
+        url = self.route_url(name, pattern)
+        if '_auth_user_id' not in self.client.session:
+            # Walking the logout route ends the session
+            self.log_in()
+        cache.clear()
+        forget_versions()
+        counter = QueryCounter()
+        with transaction.atomic():
+            with connection.execute_wrapper(counter):
+                response = self.client.get(url)
+            transaction.set_rollback(True)
+        activity_buffer.flush()
+        view_buffer.flush()
+        self.assertLess(response.status_code, 500, f"{name} ({url}) failed")
+        return counter
+
+    def test_route_query_budgets(self):
+        routes = list(self.routes())
+        self.assertTrue(routes, "no routes to walk")
+        small = {name: self.measure(name, pattern) for name, pattern in routes}
+
+        self.grow_catalog()
+        for name, pattern in routes:
+            with self.subTest(route=name):
+                large = self.measure(name, pattern)
+                max_queries, max_rows = self.budgets.get(name, self.default_budget)
+                if name not in self.growth_exempt:
+                    self.assertLessEqual(
+                        large.queries, small[name].queries,
+                        f"{name}: {small[name].queries} queries with {self.small_catalog} products but "
+                        f"{large.queries} with {self.large_catalog} (N+1?)",
+                    )
+                self.assertLessEqual(large.queries, max_queries, f"{name}: {large.queries} queries, budget {max_queries}")
+                self.assertLessEqual(large.rows, max_rows, f"{name}: {large.rows} rows, budget {max_rows}")
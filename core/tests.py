@@ -1,3 +1,231 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.models import F
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Profile
+from orders.models import Cart, CartItem
+from products.models import Brand, InventoryLog, Product, ProductImage, ProductMainCategory, Wishlist
+from .archive import ARCHIVE_AFTER_DAYS, archive_model
+from .buffer import WriteBehindBuffer
+from . import profiling
+from .loadtest import Targets, run_load_test
+from .middleware import ProfilingMiddleware
+from .models import CacheVersion, MenuList, ScheduledJob
+from .scheduler import Job, acquire, run_job
+from .testing import RouteQueryBudgetMixin, seed_catalog
+from .versions import bump_version, forget_versions, get_version
 
-# Create your tests here.
+
+class ProjectRouteQueryBudgetTests(RouteQueryBudgetMixin, TestCase):
+    urlconfs = ['ecomm_project.urls', 'core.urls']
+    default_budget = (8, 50)
+    budgets = {
+        'home': (12, 220),
+        'product_list': (13, 140),
+        'product_detail': (10, 70),
+    }
+
+
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        forget_versions()
+
+    def test_other_workers_bumps_are_seen_after_the_check_interval(self):
+        start = get_version('test:version')
+        self.assertEqual(bump_version('test:version'), get_version('test:version'))
+        bumped = get_version('test:version')
+        self.assertNotEqual(bumped, start)
+
+        # Another worker bumps the row; this process notices on its next check
+        CacheVersion.objects.filter(name='test:version').update(value=F('value') + 1)
+        self.assertEqual(get_version('test:version'), bumped)
+        forget_versions()
+        self.assertEqual(get_version('test:version'), bumped + 1)
+
+
+class ListBuffer(WriteBehindBuffer):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.written = threading.Event()
+
+    def write(self, items):
+        self.batches.append(items)
+        self.written.set()
+        return len(items)
+
+
+class WriteBehindBufferTests(TestCase):
+    def test_flushes_once_max_size_keys_are_pending(self):
+        buffer = ListBuffer(flush_interval=10 ** 9, max_size=2)
+        buffer.add('a', 1)
+        buffer.add('a', 2)
+        self.assertEqual(buffer.batches, [])
+        buffer.add('b', 3)
+        self.assertEqual(buffer.batches, [{'a': 2, 'b': 3}])
+        self.assertEqual(buffer.stats()['coalesced'], 1)
+
+    def test_flushes_after_the_interval_without_another_add(self):
+        buffer = ListBuffer(flush_interval=0.05, max_size=1000)
+        buffer.add('a', 1)
+        self.assertTrue(buffer.written.wait(5))
+        self.assertEqual(buffer.batches, [{'a': 1}])
+        self.assertEqual(buffer.stats()['pending'], 0)
+
+    def test_discarded_keys_are_not_written(self):
+        buffer = ListBuffer(flush_interval=10 ** 9, max_size=1000)
+        buffer.add('a', 1)
+        buffer.add('b', 2)
+        buffer.discard('a')
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(buffer.batches, [{'b': 2}])
+
+
+class MenuSidebarTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        Profile.objects.create(user=self.user, phone='555-0100', address='1 Test Road', city='Dhaka',
+                               state='Dhaka', country='Bangladesh', zipcode='1200')
+        self.client.post(reverse('accounts:login'), {'phone': '555-0100', 'password': 'pass'})
+
+    def test_sidebar_lists_the_menu_pages(self):
+        MenuList.objects.create(menu_name='Brand Registry', menu_url='products:brand_list', created_by=self.user)
+        MenuList.objects.create(menu_name='Remove Brand', menu_url='products:delete_brand', created_by=self.user)
+
+        response = self.client.get(reverse('accounts:dashboard'))
+        self.assertContains(response, 'Brand Registry')
+        self.assertContains(response, f'href="{reverse("products:brand_list")}"')
+        self.assertNotContains(response, 'Remove Brand')
+
+
+class LoadTestTests(TestCase):
+    def setUp(self):
+        seed_catalog(1)
+
+    def test_dashboard_journey_needs_a_staff_login(self):
+        targets = Targets()
+        results = run_load_test(workers=1, iterations=0, targets=targets)
+        self.assertNotIn('dashboard', results['meta']['mix'])
+        with self.assertRaises(ValueError):
+            run_load_test(workers=1, iterations=0, mix={'browse': 1, 'dashboard': 1}, targets=targets)
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def test_not_installed_when_profiling_is_off(self):
+        with mock.patch.object(profiling, 'PROFILING_ENABLED', False), \
+                mock.patch.object(profiling, 'PROFILING_SAMPLE_RATE', 0):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(lambda request: None)
+        with mock.patch.object(profiling, 'PROFILING_ENABLED', True):
+            ProfilingMiddleware(lambda request: None)
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.job = Job('tests.job', lambda: 3, interval=60, jitter=0, timeout=300)
+        ScheduledJob.objects.create(name=self.job.name, next_run_at=timezone.now())
+
+    def test_only_one_node_claims_a_due_job(self):
+        self.assertTrue(acquire(self.job, 'node-a'))
+        self.assertFalse(acquire(self.job, 'node-b'))
+        self.assertFalse(acquire(self.job, 'node-b', force=True))
+        self.assertEqual(ScheduledJob.objects.get(name=self.job.name).locked_by, 'node-a')
+
+    def test_expired_lease_can_be_reclaimed(self):
+        self.assertTrue(acquire(self.job, 'node-a'))
+        ScheduledJob.objects.filter(name=self.job.name).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire(self.job, 'node-b'))
+        self.assertEqual(ScheduledJob.objects.get(name=self.job.name).locked_by, 'node-b')
+
+    def test_run_job_releases_the_lock_and_schedules_the_next_run(self):
+        acquire(self.job, 'node-a')
+        self.assertEqual(run_job(self.job, 'node-a'), ('ok', 3))
+        row = ScheduledJob.objects.get(name=self.job.name)
+        self.assertEqual((row.locked_by, row.locked_until), ('', None))
+        self.assertEqual((row.last_status, row.last_rows, row.run_count), ('ok', 3, 1))
+        self.assertGreater(row.next_run_at, timezone.now() + timedelta(seconds=50))
+        self.assertFalse(acquire(self.job, 'node-b'))
+
+    def test_run_job_releases_the_lock_when_the_job_raises(self):
+        def broken():
+            raise RuntimeError('boom')
+
+        job = self.job._replace(func=broken)
+        acquire(job, 'node-a')
+        with self.assertLogs('core.scheduler', 'ERROR'):
+            self.assertEqual(run_job(job, 'node-a'), ('error', 0))
+        row = ScheduledJob.objects.get(name=job.name)
+        self.assertEqual((row.locked_by, row.locked_until), ('', None))
+        self.assertEqual((row.last_status, row.error_count), ('error', 1))
+        self.assertIn('RuntimeError: boom', row.last_error)
+        self.assertGreater(row.next_run_at, timezone.now() + timedelta(seconds=50))
+
+
+class SoftDeleteQuerySetTests(TestCase):
+    def setUp(self):
+        self.brands = [Brand.objects.create(name=f'Brand {i}') for i in range(3)]
+
+    def test_soft_delete_leaves_deleted_rows_alone(self):
+        first, second, _ = self.brands
+        self.assertEqual(Brand.all_objects.filter(pk=first.pk).soft_delete(), 1)
+        deleted_at = Brand.all_objects.get(pk=first.pk).deleted_at
+
+        self.assertEqual(Brand.all_objects.filter(pk__in=[first.pk, second.pk]).soft_delete(), 1)
+        self.assertEqual(Brand.all_objects.get(pk=first.pk).deleted_at, deleted_at)
+        self.assertEqual(Brand.all_objects.filter(pk__in=[first.pk, second.pk]).restore(), 2)
+
+    def test_delete_is_djangos_delete(self):
+        count, per_model = Brand.all_objects.filter(pk=self.brands[0].pk).delete()
+        self.assertEqual((count, per_model), (1, {'products.Brand': 1}))
+        self.assertFalse(Brand.all_objects.filter(pk=self.brands[0].pk).exists())
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('archive-user', password='x')
+        category = ProductMainCategory.objects.create(name='Archive Category', slug='archive-category')
+        self.products = [
+            Product.objects.create(name=f'Archived {i}', price=1, main_category=category) for i in range(4)
+        ]
+        old, in_cart, wished, with_image = self.products
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=in_cart, price=1)
+        Wishlist.objects.create(user=self.user, product=wished)
+        ProductImage.objects.create(product=with_image).delete()
+        InventoryLog.objects.create(product=old, change_type='in', quantity=1)
+        Product.all_objects.update(is_active=False, deleted_at=timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS + 1))
+
+    def test_rows_in_use_block_archiving(self):
+        old, in_cart, wished, with_image = self.products
+        report = archive_model(Product, sleep=0)
+        self.assertEqual(report['archived'], 2)
+        self.assertEqual(report['cascaded'], {'products.InventoryLog': 1, 'products.ProductImage': 1})
+        self.assertEqual(
+            set(Product.all_objects.values_list('pk', flat=True)), {in_cart.pk, wished.pk},
+        )
+        self.assertEqual(CartItem.objects.count(), 1)
+        self.assertEqual(Wishlist.objects.count(), 1)
+        # The image was deleted just now but follows its long-deleted product
+        self.assertFalse(ProductImage.all_objects.filter(product=with_image).exists())
+
+    def test_dry_run_reports_cascades_without_moving_anything(self):
+        report = archive_model(Product, sleep=0, dry_run=True)
+        self.assertEqual(report['archived'], 2)
+        self.assertEqual(report['cascaded'], {'products.InventoryLog': 1, 'products.ProductImage': 1})
+        self.assertEqual(Product.all_objects.count(), 4)
+        self.assertEqual(InventoryLog.objects.count(), 1)
+        self.assertEqual(ProductImage.all_objects.count(), 1)
+
+    def test_active_children_block_their_parent(self):
+        parent = MenuList.objects.create(menu_name='Old Parent', menu_url='old:parent', created_by=self.user)
+        child = MenuList.objects.create(menu_name='Live Child', menu_url='old:child', parent=parent, created_by=self.user)
+        MenuList.all_objects.filter(pk=parent.pk).update(
+            is_active=False, deleted_at=timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS + 1),
+        )
+        self.assertEqual(archive_model(MenuList, sleep=0)['archived'], 0)
+        self.assertTrue(MenuList.objects.filter(pk=child.pk).exists())
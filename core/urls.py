@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('dashboard/perf/queries/', views.query_stats_view, name='query_stats'),
+]
@@ -0,0 +1,44 @@
+"""
+Shared version counters for cached data.
+
+Permission masks, the menu tree and catalog listings are cached under keys
+that carry a version number, and bumping the version makes every worker miss
+and rebuild. The counters are rows in the database rather than cache entries,
+so all workers see the same value whatever CACHES points at (a per-process
+LocMemCache included). Each process re-reads them, all in one query, at most
+every VERSION_CHECK_INTERVAL seconds; a bump made in this process is seen at
+once, a bump made by another worker within that interval.
+"""
+import time
+from django.conf import settings
+from django.db.models import F
+from .models import CacheVersion
+
+VERSION_CHECK_INTERVAL = getattr(settings, 'VERSION_CHECK_INTERVAL', 2)
+
+_versions = {}
+_checked_at = None
+
+
+def forget_versions():
+    """Make the next get_version() re-read the counters."""
+    global _checked_at
+    _checked_at = None
+
+
+def get_version(name):
+    """The current value of counter name; 0 until it is first bumped."""
+    global _versions, _checked_at
+    now = time.monotonic()
+    if _checked_at is None or now - _checked_at >= VERSION_CHECK_INTERVAL:
+        _versions = dict(CacheVersion.objects.values_list('name', 'value'))
+        _checked_at = now
+    return _versions.get(name, 0)
+
+
+def bump_version(name):
+    if not CacheVersion.objects.filter(name=name).update(value=F('value') + 1):
+        # Start from a fresh number so keys cached before a database reset are never reused
+        CacheVersion.objects.bulk_create([CacheVersion(name=name, value=time.time_ns())], ignore_conflicts=True)
+    version = _versions[name] = CacheVersion.objects.values_list('value', flat=True).get(name=name)
+    return version
@@ -1,3 +1,12 @@
 from django.shortcuts import render
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from .instrumentation import load_query_stats, summarize
 
 # Create your views here.
+@login_required(login_url='accounts:login')
+def query_stats_view(request):
+    if not request.user.is_staff:
+        return render(request, '403.html')
+    order_by = request.GET.get('order', 'sql_ms')
+    return JsonResponse({'views': summarize(load_query_stats(), order_by)})
@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +94,98 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Cached permission masks and catalog listings are keyed by version counters
+# kept in the database (core.versions), so every worker notices a change
+# within VERSION_CHECK_INTERVAL seconds even with a per-process cache. Point
+# CACHE_BACKEND at a shared backend (Redis, Memcached, database) so workers
+# also share the cached data itself.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND') or 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+PERMISSION_CACHE_TIMEOUT = 60 * 60 * 24
+VERSION_CHECK_INTERVAL = 2
+
+# UserActivityMiddleware buffers heartbeats in memory and flushes them in one
+# bulk_update every USER_ACTIVITY_FLUSH_INTERVAL seconds (or once
+# USER_ACTIVITY_BUFFER_SIZE users are pending)
+USER_ACTIVITY_FLUSH_INTERVAL = 30
+USER_ACTIVITY_BUFFER_SIZE = 1000
+
+# Product detail views are deduplicated per viewer for PRODUCT_VIEW_DEDUPE_WINDOW
+# seconds and buffered in memory, then written every PRODUCT_VIEW_FLUSH_INTERVAL
+# seconds (0 writes each view straight away). At most PRODUCT_VIEW_BUFFER_SIZE
+# views are pending per process, which bounds what a crash can lose
+PRODUCT_VIEW_DEDUPE_WINDOW = 24 * 60 * 60
+PRODUCT_VIEW_FLUSH_INTERVAL = 10
+PRODUCT_VIEW_BUFFER_SIZE = 500
+
+# Raw views are rolled up hourly into ProductViewDaily, which feeds
+# Product.trending_score (?sort=trending): the last PRODUCT_TRENDING_WINDOW_DAYS
+# days of views, each day's weight halving every PRODUCT_TRENDING_HALF_LIFE_DAYS
+PRODUCT_TRENDING_WINDOW_DAYS = 14
+PRODUCT_TRENDING_HALF_LIFE_DAYS = 3
+
+# Parsed user agents are memoized in a per-process LRU cache; with PREWARM the
+# most frequent user agents from UserAccessLog are parsed on first use
+USER_AGENT_CACHE_SIZE = 1024
+USER_AGENT_CACHE_PREWARM = False
+
+# `manage.py archive_soft_deleted` moves rows soft-deleted more than
+# ARCHIVE_AFTER_DAYS ago into <table>_archive, ARCHIVE_BATCH_SIZE rows per
+# transaction with ARCHIVE_BATCH_SLEEP seconds between batches. Soft-deleted
+# dependents move along; plain dependent rows block the move unless their model
+# is in ARCHIVE_CASCADE_MODELS (history that belongs to the row)
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_CASCADE_MODELS = ['products.InventoryLog', 'products.ProductViewDaily']
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_BATCH_SLEEP = 0.1
+
+# QueryInstrumentationMiddleware: per-view query counts and timings, written
+# to QUERY_STATS_DIR every QUERY_STATS_FLUSH_INTERVAL seconds. Read them with
+# `manage.py query_report` or /dashboard/perf/queries/ (staff only)
+QUERY_INSTRUMENTATION = os.getenv('QUERY_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+QUERY_STATS_DIR = BASE_DIR / 'var' / 'querystats'
+QUERY_STATS_FLUSH_INTERVAL = 60
+
+# ProfilingMiddleware: cProfile a PROFILING_SAMPLE_RATE fraction of requests,
+# plus, with PROFILING_ENABLED, any request with a signed X-Profile header or
+# ?_profile= flag (see `manage.py profiling_token`). With both off the
+# middleware is not installed. Merge them with `manage.py merge_profiles`
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE') or 0)
+PROFILING_DIR = BASE_DIR / 'var' / 'profiles'
+PROFILING_MAX_FILES = 200
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+
+# `manage.py run_scheduler` runs the jobs registered in each app's jobs.py,
+# checking for due jobs every SCHEDULER_POLL_INTERVAL seconds
+SCHEDULER_POLL_INTERVAL = 5
+PRODUCT_VIEW_RETENTION_DAYS = 30
+PENDING_ORDER_EXPIRY_HOURS = 48
+GUEST_CART_EXPIRY_DAYS = 30
+
+# /search/suggest/ answers from an in-process prefix index; each worker checks
+# the shared catalog version at most every SEARCH_SUGGEST_CHECK_INTERVAL
+# seconds and rebuilds when another process changed the catalog
+SEARCH_SUGGEST_LIMIT = 8
+SEARCH_SUGGEST_CHECK_INTERVAL = 2
+
+# Product lists page with signed keyset cursors; ?show= is capped here
+PRODUCT_PAGE_SIZE_MAX = 48
+
+# The home page sections are cached and rebuilt in a background thread once
+# the catalog changes or they are older than HOME_SECTIONS_MAX_AGE seconds
+HOME_SECTIONS_MAX_AGE = 10 * 60
+HOME_SECTIONS_BACKGROUND = True
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -25,9 +25,11 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('products/', views.product_list, name='product_list'),
     path('products/<slug:slug>/', views.product_detail, name='product_detail'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
     path('', include('accounts.urls')),
     path('dashboard/', include('products.urls')),
     path('', include('orders.urls')),
+    path('', include('core.urls')),
 ]
 
 if settings.DEBUG:
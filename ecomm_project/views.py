@@ -1,55 +1,43 @@
 from django.shortcuts import render, get_object_or_404
-from products.models import Product, ProductMainCategory, ProductSubCategory, Wishlist
-from django.db.models import Q, Count
-from django.core.paginator import Paginator
-from django.utils import timezone
-from datetime import timedelta
+from products.models import Product, ProductSubCategory, Wishlist
+from products.search import search_products
+from products.suggest import suggest
+from products.facets import apply_filters, facet_counts, parse_filters
+from core.pagination import KeysetPaginator
+from products.pagination import PRODUCT_ORDERINGS, page_size
+from products.sections import get_home_sections
+from django.http import JsonResponse
 
 # Create your views here.
 def home(request):
     search = request.GET.get('search', '').strip()
     main_category_id = request.GET.get('main_category')
+    cursor = request.GET.get('cursor')
 
-    # Base queryset
-    products_qs = Product.objects.filter(is_active=True)
-
-    # Search filter
-    if search:
-        products_qs = products_qs.filter(
-            Q(name__icontains=search) |
-            Q(description__icontains=search) |
-            Q(main_category__name__icontains=search) |
-            Q(sub_category__name__icontains=search) |
-            Q(brand__name__icontains=search) |
-            Q(sku__icontains=search)
-        )
-
-    # Filter by category if selected
-    if main_category_id:
-        products_qs = products_qs.filter(main_category_id=main_category_id)
-
-    # Order by creation date
-    products_qs = products_qs.order_by('-created_at')
-
-    # Pagination for "All Products"
-    paginator = Paginator(products_qs, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    # Categories
-    categories = (
-        ProductMainCategory.objects.annotate(product_count=Count('products'))
-        .filter(is_active=True, product_count__gt=0)
-        .order_by('name')
-    )
-    for cat in categories:
-        cat.top_products = [(p, p.display_badge) for p in cat.products.filter(is_active=True)[:8]]
-
-    # Section-specific lists with badges
-    new_arrivals = [(p, ("🆕 New Arrival", "bg-success")) for p in products_qs[:8]]
-    featured_products = [(p, ("⭐ Featured", "bg-primary")) for p in Product.objects.filter(is_active=True, is_featured=True)[:8]]
-    top_selling = [(p, ("🏆 Best Seller", "bg-warning text-dark")) for p in Product.objects.filter(is_active=True).order_by('-total_views')[:8]]
-    all_products = [(p, p.display_badge) for p in page_obj.object_list]
+    # Category grid, product rows and the first "All Products" page come cached
+    sections = get_home_sections()
+    new_arrivals = sections['new_arrivals']
+    page_obj = sections['page_obj']
+
+    if search or main_category_id or cursor:
+        products_qs = Product.objects.for_cards().filter(is_active=True)
+
+        # Filter by category if selected
+        if main_category_id:
+            products_qs = products_qs.filter(main_category_id=main_category_id)
+
+        # Search results by relevance, otherwise newest first
+        if search:
+            products_qs = search_products(products_qs, search)
+        else:
+            products_qs = products_qs.order_by('-created_at')
+
+        # Cursor pagination for "All Products"
+        paginator = KeysetPaginator(products_qs, None if search else PRODUCT_ORDERINGS['newest'], per_page=12)
+        page_obj = paginator.page(cursor)
+        page_obj.object_list = [(p, p.display_badge) for p in page_obj.object_list]
+        if search or main_category_id:
+            new_arrivals = [(p, ("🆕 New Arrival", "bg-success")) for p in products_qs[:8]]
 
     wishlist_ids = []
     if request.user.is_authenticated:
@@ -58,11 +46,11 @@ def home(request):
         ).values_list('product_id', flat=True)
 
     context = {
-        'categories': categories,
+        'categories': sections['categories'],
         'new_arrivals': new_arrivals,
-        'featured_products': featured_products,
-        'top_selling': top_selling,
-        'products': all_products,
+        'featured_products': sections['featured_products'],
+        'top_selling': sections['top_selling'],
+        'products': page_obj.object_list,
         'page_obj': page_obj,
         'search': search,
         'main_category_id': main_category_id,
@@ -72,22 +60,12 @@ def home(request):
     return render(request, 'frontend/home.html', context)
 
 def product_list(request):
-    products = Product.objects.filter(is_active=True).select_related('main_category')
+    products = Product.objects.for_cards().filter(is_active=True)
 
     # Search
     search_query = request.GET.get('search', '').strip()
     if search_query:
-        products = products.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(main_category__name__icontains=search_query) |
-            Q(sub_category__name__icontains=search_query)
-        )
-
-    # Category filter
-    category_ids = request.GET.getlist('category')
-    if category_ids:
-        products = products.filter(main_category_id__in=category_ids)
+        products = search_products(products, search_query)
 
     # Price filter
     try:
@@ -98,50 +76,24 @@ def product_list(request):
     except ValueError:
         pass
 
-    # Rating filter
-    ratings = request.GET.getlist('rating')
-    if ratings:
-        try:
-            products = products.filter(average_rating__gte=min(map(int, ratings)))
-        except ValueError:
-            pass
-
-    # 🏷 Availability
-    if request.GET.get('stock') == 'in-stock':
-        products = products.filter(quantity__gt=0)
-    if request.GET.get('sale') == 'on-sale':
-        products = products.filter(sale_price__isnull=False)
-    if request.GET.get('new') == 'new':
-        cutoff = timezone.now() - timedelta(days=30)
-        products = products.filter(created_at__gte=cutoff)
+    # Category, brand, price bucket and availability facets; counts come
+    # from the catalog before these filters so other values stay visible
+    filters = parse_filters(request.GET)
+    facets = facet_counts(products, filters)
+    products = apply_filters(products, filters)
 
     # Sorting
-    sort_option = request.GET.get('sort', 'featured')
-    sort_map = {
-        'price-low': 'price',
-        'price-high': '-price',
-        'rating': '-average_rating',
-        'newest': '-created_at',
-        'name': 'name',
-        'featured': '-id',
-    }
-    products = products.order_by(sort_map.get(sort_option, '-id'))
+    sort_option = request.GET.get('sort', 'relevance' if search_query else 'featured')
+    if search_query and sort_option == 'relevance':
+        ordering = None
+    else:
+        ordering = PRODUCT_ORDERINGS.get(sort_option, PRODUCT_ORDERINGS['featured'])
 
     # Pagination
-    per_page = int(request.GET.get('show', 12))
-    paginator = Paginator(products, per_page)
-    page_obj = paginator.get_page(request.GET.get('page'))
-
-    # Category counts
-    categories = (
-        ProductMainCategory.objects.annotate(product_count=Count('products'))
-        .filter(is_active=True, product_count__gt=0)
-        .order_by('name')
-    )
+    paginator = KeysetPaginator(products, ordering, per_page=page_size(request.GET.get('show')))
+    page_obj = paginator.page(request.GET.get('cursor'))
 
-    # Convert selected categories to integers for comparison
-    selected_categories = [int(cat_id) for cat_id in category_ids if cat_id.isdigit()]
-    selected_ratings = ratings
+    selected_categories = sorted(filters['category'])
 
     wishlist_ids = []
     if request.user.is_authenticated:
@@ -151,9 +103,9 @@ def product_list(request):
 
     context = {
         'products': page_obj,
-        'categories': categories,
+        'categories': facets['category'],
+        'facets': facets,
         'selected_categories': selected_categories,
-        'selected_ratings': selected_ratings,
         'request': request,
         'user_wishlist_ids': wishlist_ids
     }
@@ -163,7 +115,7 @@ def product_list(request):
 def product_detail(request, slug):
     product = get_object_or_404(Product, slug=slug, is_active=True)
     product.add_view(request)
-    related_products = Product.objects.filter(
+    related_products = Product.objects.for_cards().filter(
         main_category=product.main_category
     ).exclude(id=product.id)[:4]
 
@@ -177,4 +129,8 @@ def product_detail(request, slug):
         'product': product,
         'related_products': related_products,
         'user_wishlist_ids': wishlist_ids
-    })
\ No newline at end of file
+    })
+
+def search_suggest(request):
+    query = request.GET.get('q', '')[:100]
+    return JsonResponse({'query': query, 'suggestions': suggest(query)})
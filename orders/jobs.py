@@ -0,0 +1,33 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from core.scheduler import register_job
+from .models import Cart, CartItem, OnlinePaymentRequest, Order
+
+PENDING_ORDER_EXPIRY_HOURS = getattr(settings, 'PENDING_ORDER_EXPIRY_HOURS', 48)
+GUEST_CART_EXPIRY_DAYS = getattr(settings, 'GUEST_CART_EXPIRY_DAYS', 30)
+
+
+@register_job(interval=60 * 60, jitter=5 * 60)
+def expire_pending_orders():
+    """
+    Cancel abandoned orders: pending and unpaid for too long, with no payment
+    session that is open or paid. Orders whose customer may still be at the
+    gateway are left alone; only failed or cancelled sessions count as given up.
+    """
+    cutoff = timezone.now() - timedelta(hours=PENDING_ORDER_EXPIRY_HOURS)
+    in_payment = OnlinePaymentRequest.objects.filter(payment_status__in=['Pending', 'Paid']).values('order_id')
+    return (
+        Order.objects.filter(status='pending', paid_status='unpaid', updated_at__lt=cutoff)
+        .exclude(pk__in=in_payment)
+        .update(status='cancelled', updated_at=timezone.now())
+    )
+
+
+@register_job(interval=6 * 60 * 60, jitter=15 * 60)
+def expire_guest_carts():
+    """Soft-delete guest carts (and their items) with no activity for GUEST_CART_EXPIRY_DAYS."""
+    cutoff = timezone.now() - timedelta(days=GUEST_CART_EXPIRY_DAYS)
+    stale = Cart.objects.filter(user__isnull=True, updated_at__lt=cutoff).exclude(cart_items__updated_at__gte=cutoff)
+    rows = CartItem.objects.filter(cart__in=stale).soft_delete()
+    return rows + Cart.objects.filter(pk__in=stale.values('pk')).soft_delete()
@@ -1,3 +1,75 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Profile
+from core.testing import RouteQueryBudgetMixin
+from products.models import Product, ProductMainCategory
+from .jobs import PENDING_ORDER_EXPIRY_HOURS, expire_pending_orders
+from .models import CartItem, OnlinePaymentRequest, Order
+from .views_payment import update_payment_in_order
 
-# Create your tests here.
+
+class OrderRouteQueryBudgetTests(RouteQueryBudgetMixin, TestCase):
+    urlconfs = ['orders.urls']
+    default_budget = (8, 50)
+    budgets = {
+        'checkout': (17, 50),
+        'download_invoice': (10, 50),
+    }
+    skip_routes = {
+        'place_order': "POST only; returns no response to a GET",
+        'payment_check': "always calls the SSLCommerz validation API",
+    }
+
+
+class PendingOrderExpiryTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user('customer', password='pass')
+        self.old = timezone.now() - timedelta(hours=PENDING_ORDER_EXPIRY_HOURS + 1)
+
+    def order(self, payment_status=None):
+        order = Order.objects.create(customer=self.customer, grand_total=100, due_amount=100)
+        if payment_status:
+            OnlinePaymentRequest.objects.create(order=order, transaction_id=f'txn-{order.pk}', amount=100,
+                                                payment_status=payment_status, created_by=self.customer)
+        Order.objects.filter(pk=order.pk).update(updated_at=self.old)
+        return order
+
+    def test_only_abandoned_orders_expire(self):
+        abandoned = self.order()
+        gave_up = self.order('Failed')
+        at_gateway = self.order('Pending')
+
+        self.assertEqual(expire_pending_orders(), 2)
+        statuses = dict(Order.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[abandoned.pk], 'cancelled')
+        self.assertEqual(statuses[gave_up.pk], 'cancelled')
+        self.assertEqual(statuses[at_gateway.pk], 'pending')
+
+    def test_payment_for_a_cancelled_order_does_not_revive_it(self):
+        order = self.order('Pending')
+        Order.objects.filter(pk=order.pk).update(status='cancelled')
+
+        with self.assertLogs('orders.views_payment', 'WARNING'):
+            self.assertTrue(update_payment_in_order(f'txn-{order.pk}'))
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'cancelled')
+        self.assertEqual(order.paid_amount, 100)
+        self.assertEqual(OnlinePaymentRequest.objects.get(order=order).payment_status, 'Paid')
+
+
+class AddToCartTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('shopper', password='pass')
+        Profile.objects.create(user=user, phone='555-0200', address='1 Test Road', city='Dhaka',
+                               state='Dhaka', country='Bangladesh', zipcode='1200')
+        self.client.post(reverse('accounts:login'), {'phone': '555-0200', 'password': 'pass'})
+        category = ProductMainCategory.objects.create(name='Cart Things')
+        self.product = Product.objects.create(name='Full Price Mug', price=12, main_category=category)
+
+    def test_product_without_a_sale_price_uses_its_price(self):
+        response = self.client.post(reverse('add_to_cart'), {'product_id': self.product.pk, 'quantity': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(CartItem.objects.get(product=self.product).price, 12)
@@ -3,7 +3,9 @@ from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
+from django.db.models import Prefetch
 from products.models import Product
+from core.pagination import KeysetPaginator
 from .models import Cart, CartItem, Coupon, ShippingAddress, BillingAddress, Order, OrderDetail
 from django.utils import timezone
 from decimal import Decimal
@@ -11,6 +13,7 @@ from core.permissions import CheckUserPermission
 from django.http import FileResponse
 from .utils import generate_invoice
 
+ORDER_LIST_PAGE_SIZE = 10
 
 
 @login_required
@@ -97,7 +100,7 @@ def add_to_cart(request):
                 product=product,
                 defaults={
                     'is_active': True,
-                    'price': float(product.sale_price if product.on_sale else product.price),
+                    'price': float(product.sale_price if product.on_sale() else product.price),
                     'quantity': qty
                 }
             )
@@ -134,7 +137,7 @@ def get_cart(request):
 
 
 def serialize_cart(cart):
-    cart_items = cart.cart_items.filter(is_active=True)
+    cart_items = cart.cart_items.filter(is_active=True).select_related("product")
 
     return [
         {
@@ -244,7 +247,7 @@ def checkout(request):
         order.due_amount = grand_total - order.paid_amount
         order.save()
 
-    order.order_details.all().delete()
+    order.order_details.all().hard_delete()
 
     for item in cart_items:
         OrderDetail.objects.create(
@@ -356,7 +359,7 @@ def place_order(request):
         order.save(update_fields=['shipping_address', 'billing_address'])
 
         # Deactivate cart items (soft-delete)
-        CartItem.objects.filter(cart=get_user_cart(request), is_active=True).update(is_active=False)
+        CartItem.objects.filter(cart=get_user_cart(request)).soft_delete(user=request.user)
         request.session['coupon'] = None
 
         return JsonResponse({
@@ -366,8 +369,13 @@ def place_order(request):
 
 @login_required
 def order_list(request):
-    orders = Order.objects.filter(customer=request.user).prefetch_related('order_payments').order_by('-created_at')
-    return render(request, 'orders/index.html', {'orders': orders})
+    orders = Order.objects.filter(customer=request.user).prefetch_related(
+        Prefetch('order_details', queryset=OrderDetail.objects.select_related('product'))
+    )
+    page_obj = KeysetPaginator(orders, ('-created_at', '-id'), per_page=ORDER_LIST_PAGE_SIZE, salt='orders.list').page(
+        request.GET.get('cursor')
+    )
+    return render(request, 'orders/index.html', {'orders': page_obj, 'page_obj': page_obj})
 
 @login_required
 def download_invoice(request, order_id):
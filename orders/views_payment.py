@@ -1,3 +1,4 @@
+import logging
 from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
@@ -8,13 +9,13 @@ from django.db.models import Sum, F
 from django.utils import timezone
 from django.conf import settings
 from uuid import uuid4
-import requests
 from django.contrib.auth.decorators import login_required
 from .email_utils import send_payment_success_email, send_order_status_email
 
 
 from .models import Order, OnlinePaymentRequest, OrderPayment, Coupon
 
+logger = logging.getLogger(__name__)
 
 @login_required
 @csrf_exempt
@@ -109,6 +110,7 @@ def create_payment_request(request, order_id):
 
     print(f"Payment Data: {payment_data}")
 
+    import requests
     response = requests.post(settings.SSLCOMMERZ_API_URL, data=payment_data)
     data = response.json()
 
@@ -144,7 +146,14 @@ def payment_complete(request, str_data):
 
         if status_data:
             update_payment_in_order(payment_object.transaction_id)
-            messages.success(request, f"Payment confirmed for order {payment_object.order.id}")
+            if payment_object.order.status == 'cancelled':
+                messages.warning(
+                    request,
+                    f"Order {payment_object.order.id} was cancelled before your payment arrived. "
+                    "We have recorded the payment and will contact you about a refund.",
+                )
+            else:
+                messages.success(request, f"Payment confirmed for order {payment_object.order.id}")
 
         else:
             messages.error(request, "Payment verification failed")
@@ -164,6 +173,7 @@ def verify_ssl_payment(val_id):
         'format': 'json'
     }
 
+    import requests
     response = requests.get(settings.SSLCOMMERZ_VALIDATION_API, params=payload)
     print(f"SSL Verification Response: {response.text}")
     result = response.json()
@@ -246,6 +256,16 @@ def update_payment_in_order(transaction_id):
     order.paid_amount = total_paid
     order.due_amount = order.grand_total - total_paid
 
+    # The order was cancelled (e.g. expired) while the customer was at the
+    # gateway. Keep the money on record, but don't revive the order
+    if order.status == 'cancelled':
+        logger.warning(
+            "Payment %s received for cancelled order %s; refund or reinstate it by hand",
+            transaction_id, order.order_number,
+        )
+        order.save(update_fields=['paid_amount', 'due_amount'])
+        return True
+
     # Coupon usage update (SAFE)
     if order.coupon_discount > 0 and hasattr(order, 'applied_coupon') and order.applied_coupon:
         Coupon.objects.filter(
@@ -0,0 +1,12 @@
+from core.versions import bump_version, get_version
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def get_catalog_version():
+    """Version of the storefront catalog; changes whenever products, categories or brands do."""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    return bump_version(CATALOG_VERSION_KEY)
@@ -0,0 +1,158 @@
+"""
+Facet counts for the storefront product list.
+
+facet_counts() runs a fixed four queries however large the taxonomy is:
+one GROUP BY each for category, brand and price bucket, and one aggregate
+for the total and the availability flags. A value's count applies every
+selected filter except the ones on its own facet, so ticking a brand still
+shows how many products the other brands would add. The category and brand
+names are cached per catalog version.
+
+Prices are bucketed and filtered by the price the product card shows: the
+sale price when there is one.
+
+Product has no rating column, so there is no rating facet.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .cache import get_catalog_version
+from .models import Brand, ProductMainCategory
+
+NEW_ARRIVAL_DAYS = 30
+
+# (key, label, lower bound, upper bound); bounds are inclusive/exclusive
+PRICE_BUCKETS = [
+    ('0-25', 'Under $25', None, 25),
+    ('25-50', '$25 to $50', 25, 50),
+    ('50-100', '$50 to $100', 50, 100),
+    ('100-250', '$100 to $250', 100, 250),
+    ('250-500', '$250 to $500', 250, 500),
+    ('500-1000', '$500 to $1,000', 500, 1000),
+    ('1000-', '$1,000 & Above', 1000, None),
+]
+PRICE_BUCKET_KEYS = [key for key, *_ in PRICE_BUCKETS]
+
+FLAGS = {'stock': 'in-stock', 'sale': 'on-sale', 'new': 'new'}
+
+
+def _ids(values):
+    return {int(value) for value in values if value.isdigit()}
+
+
+def parse_filters(params):
+    """Selected facet values from request.GET: {facet: set of values}; flags map to {True}."""
+    filters = {
+        'category': _ids(params.getlist('category')),
+        'brand': _ids(params.getlist('brand')),
+        'price': {PRICE_BUCKET_KEYS.index(key) for key in params.getlist('price') if key in PRICE_BUCKET_KEYS},
+    }
+    for facet, flag in FLAGS.items():
+        filters[facet] = {True} if params.get(facet) == flag else set()
+    return filters
+
+
+def _with_shown_price(queryset):
+    return queryset.alias(shown_price=Coalesce('sale_price', 'price'))
+
+
+def _price_q(index):
+    _, _, low, high = PRICE_BUCKETS[index]
+    q = Q()
+    if low is not None:
+        q &= Q(shown_price__gte=Decimal(low))
+    if high is not None:
+        q &= Q(shown_price__lt=Decimal(high))
+    return q
+
+
+def _facet_q(facet, values):
+    if facet == 'category':
+        return Q(main_category_id__in=values)
+    if facet == 'brand':
+        return Q(brand_id__in=values)
+    if facet == 'price':
+        q = Q()
+        for index in values:
+            q |= _price_q(index)
+        return q
+    if facet == 'stock':
+        return Q(quantity__gt=0)
+    if facet == 'sale':
+        return Q(sale_price__isnull=False)
+    return Q(created_at__gte=timezone.now() - timedelta(days=NEW_ARRIVAL_DAYS))
+
+
+def apply_filters(queryset, filters):
+    queryset = _with_shown_price(queryset)
+    for facet, values in filters.items():
+        if values:
+            queryset = queryset.filter(_facet_q(facet, values))
+    return queryset
+
+
+def _facet_labels():
+    key = f'products:facet-labels:{get_catalog_version()}'
+    labels = cache.get(key)
+    if labels is None:
+        labels = {
+            'category': dict(ProductMainCategory.objects.filter(is_active=True).order_by('name').values_list('id', 'name')),
+            'brand': dict(Brand.objects.filter(is_active=True).order_by('name').values_list('id', 'name')),
+        }
+        cache.set(key, labels, 60 * 60)
+    return labels
+
+
+def _others_q(filters, facet=None):
+    q = Q()
+    for other, values in filters.items():
+        if values and other != facet:
+            q &= _facet_q(other, values)
+    return q
+
+
+def _grouped_counts(queryset, filters, facet, group_by):
+    rows = queryset.filter(_others_q(filters, facet)).values(group_by).annotate(product_count=Count('pk'))
+    return {row[group_by]: row['product_count'] for row in rows}
+
+
+def facet_counts(queryset, filters):
+    """
+    Count products per facet value for queryset (the catalog narrowed by
+    everything except facet filters). Returns {'total': n, facet: [{'id',
+    'name', 'product_count', 'selected'}]} with flags as {'count', 'selected'}.
+    """
+    labels = _facet_labels()
+    queryset = _with_shown_price(queryset.order_by())
+    bucket = Case(
+        *[When(_price_q(index), then=Value(index)) for index in range(len(PRICE_BUCKETS))],
+        output_field=IntegerField(),
+    )
+    counts = {
+        'category': _grouped_counts(queryset, filters, 'category', 'main_category_id'),
+        'brand': _grouped_counts(queryset, filters, 'brand', 'brand_id'),
+        'price': _grouped_counts(queryset.annotate(price_bucket=bucket), filters, 'price', 'price_bucket'),
+    }
+    totals = queryset.aggregate(
+        total=Count('pk', filter=_others_q(filters)),
+        **{facet: Count('pk', filter=_others_q(filters, facet) & _facet_q(facet, None)) for facet in FLAGS},
+    )
+
+    result = {'total': totals['total']}
+    for facet in ('category', 'brand'):
+        result[facet] = [
+            {'id': pk, 'name': name, 'product_count': counts[facet].get(pk, 0), 'selected': pk in filters[facet]}
+            for pk, name in labels[facet].items()
+            if counts[facet].get(pk) or pk in filters[facet]
+        ]
+    result['price'] = [
+        {'id': key, 'name': label, 'product_count': counts['price'].get(index, 0), 'selected': index in filters['price']}
+        for index, (key, label, _, _) in enumerate(PRICE_BUCKETS)
+        if counts['price'].get(index) or index in filters['price']
+    ]
+    for facet in FLAGS:
+        result[facet] = {'count': totals[facet], 'selected': bool(filters[facet])}
+    return result
@@ -0,0 +1,20 @@
+from django.conf import settings
+from core.scheduler import register_job
+from .models import ProductView
+from .trending import rolled_up_until, rollup_views, update_trending_scores
+
+PRODUCT_VIEW_RETENTION_DAYS = getattr(settings, 'PRODUCT_VIEW_RETENTION_DAYS', 30)
+
+
+@register_job(interval=60 * 60, jitter=5 * 60)
+def rollup_product_views():
+    return rollup_views() + update_trending_scores()
+
+
+@register_job(interval=24 * 60 * 60, jitter=30 * 60, timeout=2 * 60 * 60)
+def cleanup_old_views():
+    # Raw views only need to live until they are rolled up
+    rolled_up = rolled_up_until()
+    if rolled_up is None:
+        return 0
+    return ProductView.cleanup_old_views(days=PRODUCT_VIEW_RETENTION_DAYS, before=rolled_up)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Recompute Product.primary_image_url from each product's primary image"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = Product.backfill_primary_images(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated {count} products"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from products import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text search index from the catalog"
+
+    def handle(self, *args, **options):
+        backend = search.search_backend()
+        if not backend:
+            self.stdout.write(self.style.WARNING("No search index for this database; search uses icontains"))
+            return
+        with transaction.atomic():
+            search.create_index()
+            search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the {backend} search index"))
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+# Frozen copy of products.search as of this migration; later changes to the
+# live index belong in a new migration, not here.
+SOURCE_JOINS = """
+    FROM products p
+    LEFT JOIN brands b ON b.id = p.brand_id
+    LEFT JOIN product_category c ON c.id = p.main_category_id
+    LEFT JOIN product_sub_category s ON s.id = p.sub_category_id
+"""
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS product_search USING fts5("
+    "name, sku, brand, category, sub_category, description, tokenize='unicode61 remove_diacritics 2')",
+    "DELETE FROM product_search",
+    "INSERT INTO product_search (rowid, name, sku, brand, category, sub_category, description) "
+    f"SELECT p.id, p.name, p.sku, b.name, c.name, s.name, p.description {SOURCE_JOINS}",
+]
+
+POSTGRESQL_CREATE = [
+    "CREATE TABLE IF NOT EXISTS product_search ("
+    "product_id bigint PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS product_search_document ON product_search USING GIN (document)",
+    "TRUNCATE product_search",
+    "INSERT INTO product_search (product_id, document) SELECT p.id, "
+    "setweight(to_tsvector('simple', coalesce(p.name, '') || ' ' || coalesce(p.sku, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(b.name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(c.name, '') || ' ' || coalesce(s.name, '')), 'C') || "
+    f"setweight(to_tsvector('simple', coalesce(p.description, '')), 'D') {SOURCE_JOINS}",
+]
+
+CREATE = {'sqlite': SQLITE_CREATE, 'postgresql': POSTGRESQL_CREATE}
+
+
+def create_search_index(apps, schema_editor):
+    for sql in CREATE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE:
+        schema_editor.execute("DROP TABLE IF EXISTS product_search")
+
+
+class Migration(migrations.Migration):
+    """Full-text index table: FTS5 on SQLite, tsvector + GIN on PostgreSQL, nothing elsewhere."""
+
+    dependencies = [
+        ('products', '0004_product_primary_image_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['main_category', '-total_views', '-id'], name='products_main_ca_41376d_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_category_views_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productview',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_view_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Product Daily Views',
+                'db_table': 'product_view_daily',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-trending_score', '-id'], name='products_trendin_66df30_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productview',
+            index=models.Index(fields=['created_at'], name='product_vie_created_cf7baa_idx'),
+        ),
+        migrations.AddField(
+            model_name='productviewdaily',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='products.product'),
+        ),
+        migrations.AddIndex(
+            model_name='productviewdaily',
+            index=models.Index(fields=['date'], name='product_vie_date_38db37_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productviewdaily',
+            unique_together={('product', 'date')},
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+DEFAULT_IMAGE = '/static/defaults/default-image.jpg'
+BATCH_SIZE = 1000
+
+
+def image_url(image):
+    # Mirrors ProductImage.get_image_url, which historical models don't have
+    if image.image:
+        path = str(image.image)
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        try:
+            return image.image.url
+        except ValueError:
+            pass
+    return DEFAULT_IMAGE
+
+
+def backfill_primary_image_url(apps, schema_editor):
+    """Fill Product.primary_image_url for products saved before 0004 added it."""
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    last_pk = 0
+    while True:
+        batch = list(Product.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'primary_image_url')[:BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        primaries = {}
+        images = ProductImage.objects.filter(
+            product_id__in=[product.pk for product in batch], is_primary=True, is_active=True,
+        ).order_by('pk')
+        for image in images:
+            primaries[image.product_id] = image_url(image)
+        stale = []
+        for product in batch:
+            url = primaries.get(product.pk, '')
+            if product.primary_image_url != url:
+                product.primary_image_url = url
+                stale.append(product)
+        Product.objects.bulk_update(stale, ['primary_image_url'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_view_daily_trending'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_primary_image_url, migrations.RunPython.noop),
+    ]
@@ -2,11 +2,11 @@ from datetime import timedelta
 from django.utils import timezone
 from django.utils.text import slugify
 from django.conf import settings
-from .utils import get_client_ip 
-from django.db.models import F
-from django.db import models
+from django.db.models import F, OuterRef, Subquery, Window
+from django.db.models.functions import RowNumber
+from django.db import connections, models
 from django.contrib.auth import get_user_model
-from core.models import TimeStampedModel, SoftDeleteModel, AuditModel
+from core.models import TimeStampedModel, SoftDeleteModel, AuditModel, ActiveManager, SoftDeleteManager, SoftDeleteQuerySet
 import random
 import string
 
@@ -112,6 +112,43 @@ class ProductSubCategory(TimeStampedModel, SoftDeleteModel, AuditModel):
                 pass
         return '/static/defaults/default-image.jpg'
 
+class ProductQuerySet(SoftDeleteQuerySet):
+    # Everything a product card or list row renders, including display_badge
+    CARD_FIELDS = (
+        'name', 'slug', 'price', 'sale_price', 'quantity', 'is_featured', 'is_active',
+        'discount_percentage', 'total_views', 'primary_image_url', 'created_at',
+        'main_category__name', 'main_category__slug',
+        'sub_category__name', 'sub_category__slug',
+        'brand__name',
+    )
+
+    def for_cards(self):
+        """Load only the card fields, with category and brand joined in; skips the large text columns."""
+        return self.select_related('main_category', 'sub_category', 'brand').only(*self.CARD_FIELDS)
+
+    def top_per_category(self, limit, ordering=('-total_views', '-id')):
+        """
+        The first limit products of each main category in ordering, in one
+        query, as {main_category_id: [products]}. Only ids are ranked, with
+        ROW_NUMBER() over a category partition; databases without window
+        functions (SQLite before 3.25) get a correlated LIMIT subquery.
+        """
+        if connections[self.db].features.supports_over_clause:
+            top = self.order_by().annotate(category_rank=Window(
+                RowNumber(), partition_by=F('main_category_id'), order_by=list(ordering),
+            )).filter(category_rank__lte=limit).values('pk')
+        else:
+            top = Subquery(
+                self.filter(main_category_id=OuterRef('main_category_id')).order_by(*ordering).values('pk')[:limit]
+            )
+        ranked = self.filter(pk__in=top)
+
+        grouped = {}
+        for product in ranked.order_by('main_category_id', *ordering):
+            grouped.setdefault(product.main_category_id, []).append(product)
+        return grouped
+
+
 class Product(TimeStampedModel, SoftDeleteModel, AuditModel):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=150, unique=True, blank=True)
@@ -125,17 +162,32 @@ class Product(TimeStampedModel, SoftDeleteModel, AuditModel):
     brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name='products', blank=True, null=True)
     is_featured = models.BooleanField(default=False)
     total_views = models.PositiveIntegerField(default=0)
+    # Time-decayed views from ProductViewDaily, kept by products.trending
+    trending_score = models.FloatField(default=0)
     discount_percentage = models.PositiveIntegerField(default=0, blank=True, null=True)
     discount_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
+    # Resolved URL of the primary ProductImage, kept current by ProductImage.save/delete
+    primary_image_url = models.CharField(max_length=500, blank=True, default='')
 
     meta_title = models.CharField(max_length=255, blank=True, null=True)
     meta_description = models.TextField(blank=True, null=True)
     meta_keywords = models.CharField(max_length=255, blank=True, null=True)
 
+    objects = ActiveManager.from_queryset(ProductQuerySet)()
+    all_objects = SoftDeleteManager.from_queryset(ProductQuerySet)()
+
     class Meta:
         db_table = 'products'
-        indexes = [models.Index(fields=['-total_views'])]
+        # Keyset pagination seeks on (sort column, id)
+        indexes = [
+            models.Index(fields=['-total_views']),
+            models.Index(fields=['-trending_score', '-id']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['price', 'id']),
+            # top_per_category() ranks within a category by views
+            models.Index(fields=['main_category', '-total_views', '-id']),
+        ]
         verbose_name_plural = 'Products'
         ordering = ['-is_active']
 
@@ -145,29 +197,40 @@ class Product(TimeStampedModel, SoftDeleteModel, AuditModel):
         return f"{cat}-{brand}-{self.id}"
 
     def get_primary_image(self):
-        primary = self.product_images.filter(is_primary=True).first()
-        if primary:
-            return primary.get_image_url()
-        return '/static/defaults/default-image.jpg'
+        return self.primary_image_url or '/static/defaults/default-image.jpg'
 
-    def add_view(self, request):
-        session_key = request.session.session_key
-        if not session_key:
-            request.session.create()
-            session_key = request.session.session_key
-
-        if not ProductView.objects.filter(product=self, session_key=session_key).exists():
-            ProductView.objects.create(
-                product=self,
-                user=request.user if request.user.is_authenticated else None,
-                session_key=session_key,
-                ip_address=get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', '')[:255],
-            )
-            Product.objects.filter(pk=self.pk).update(total_views=F('total_views') + 1)
-            return True  # ✅ indicates new view
-        return False
+    def refresh_primary_image(self):
+        primary = ProductImage.objects.filter(product_id=self.pk, is_primary=True).order_by('-pk').first()
+        self.primary_image_url = primary.get_image_url() if primary else ''
+        Product.all_objects.filter(pk=self.pk).update(primary_image_url=self.primary_image_url)
 
+    @classmethod
+    def backfill_primary_images(cls, queryset=None, batch_size=1000):
+        """Recompute primary_image_url for queryset (default: every product) in pk batches; returns rows changed."""
+        queryset = (queryset if queryset is not None else cls.all_objects.all()).order_by('pk')
+        changed = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).only('pk', 'primary_image_url')[:batch_size])
+            if not batch:
+                return changed
+            last_pk = batch[-1].pk
+            primaries = {}
+            for image in ProductImage.objects.filter(product_id__in=[p.pk for p in batch], is_primary=True).order_by('pk'):
+                primaries[image.product_id] = image.get_image_url()
+            stale = []
+            for product in batch:
+                url = primaries.get(product.pk, '')
+                if product.primary_image_url != url:
+                    product.primary_image_url = url
+                    stale.append(product)
+            cls.all_objects.bulk_update(stale, ['primary_image_url'])
+            changed += len(stale)
+
+    def add_view(self, request):
+        """Count a view from this request; written later in a batch (see products.tracking)."""
+        from .tracking import record_view
+        return record_view(self, request)
 
     def in_stock(self):
         return self.quantity > 0
@@ -233,6 +296,11 @@ class ProductImage(TimeStampedModel, SoftDeleteModel, AuditModel):
         elif not ProductImage.objects.filter(product=self.product, is_primary=True).exists():
             self.is_primary = True
         super().save(*args, **kwargs)
+        self.product.refresh_primary_image()
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        self.product.refresh_primary_image()
 
     def get_image_url(self):
         if self.image:
@@ -298,7 +366,8 @@ class ProductView(models.Model):
     session_key = models.CharField(max_length=40, blank=True, null=True, help_text="Anonymous session identifier")
     ip_address = models.GenericIPAddressField( blank=True, null=True,  help_text="Optional: track visitor IP")
     user_agent = models.CharField(max_length=255, blank=True,null=True,help_text="Browser or device info")
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: buffered views keep the time they happened, not the flush time
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'product_views'
@@ -307,15 +376,37 @@ class ProductView(models.Model):
         indexes = [
             models.Index(fields=['product', 'session_key']),
             models.Index(fields=['product', 'created_at']),
+            models.Index(fields=['created_at']),
         ]
     
     @classmethod
-    def cleanup_old_views(cls, days=180):
+    def cleanup_old_views(cls, days=180, before=None):
+        """Delete views older than days, never touching anything from before on (rows not rolled up yet)."""
         cutoff = timezone.now() - timedelta(days=days)
-        cls.objects.filter(created_at__lt=cutoff).delete()
+        if before is not None:
+            cutoff = min(cutoff, before)
+        deleted, _ = cls.objects.filter(created_at__lt=cutoff).delete()
+        return deleted
         
 
     def __str__(self):
         viewer = self.user.username if self.user else f"Session {self.session_key}"
         return f"{self.product.name} viewed by {viewer}"
 
+
+class ProductViewDaily(models.Model):
+    product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='daily_views')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'product_view_daily'
+        verbose_name_plural = 'Product Daily Views'
+        ordering = ['-date']
+        unique_together = ('product', 'date')
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.date}: {self.views}"
@@ -0,0 +1,26 @@
+"""
+Product list orderings and page sizes; the paginator is core.pagination's.
+"""
+from django.conf import settings
+
+PRODUCT_PAGE_SIZE_MAX = getattr(settings, 'PRODUCT_PAGE_SIZE_MAX', 48)
+
+# Storefront ?sort= values
+PRODUCT_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'price-low': ('price', 'id'),
+    'price-high': ('-price', '-id'),
+    'name': ('name', 'id'),
+    'views': ('-total_views', '-id'),
+    'trending': ('-trending_score', '-id'),
+    'featured': ('-id',),
+}
+
+
+def page_size(value, default=12):
+    """Parse a ?show= style page size, capped at PRODUCT_PAGE_SIZE_MAX."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, PRODUCT_PAGE_SIZE_MAX))
@@ -0,0 +1,182 @@
+"""
+Full-text product search.
+
+The index is a side table keyed by product id holding the product's name,
+sku, description and its brand and category names. SQLite uses an FTS5
+virtual table ranked with bm25(); PostgreSQL uses a weighted tsvector with a
+GIN index ranked with ts_rank(). Other databases have no index and fall back
+to the old icontains scan.
+
+Rows are rewritten with one INSERT ... SELECT per change, so updating a
+category or brand name reindexes all of its products in a single statement.
+products.signals keeps the index current; `manage.py rebuild_search_index`
+rebuilds it from scratch.
+"""
+import re
+from django.db import connection
+from django.db.models import Q
+
+SEARCH_TABLE = 'product_search'
+MAX_TERMS = 8
+# Ids bound per statement when reindexing a list of rows
+ID_BATCH_SIZE = 500
+
+# bm25 column weights, in FTS5 column order
+FTS5_COLUMNS = ('name', 'sku', 'brand', 'category', 'sub_category', 'description')
+FTS5_WEIGHTS = (10.0, 8.0, 4.0, 3.0, 3.0, 1.0)
+
+SOURCE_JOINS = """
+    FROM products p
+    LEFT JOIN brands b ON b.id = p.brand_id
+    LEFT JOIN product_category c ON c.id = p.main_category_id
+    LEFT JOIN product_sub_category s ON s.id = p.sub_category_id
+"""
+
+PG_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(p.name, '') || ' ' || coalesce(p.sku, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(b.name, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(c.name, '') || ' ' || coalesce(s.name, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(p.description, '')), 'D')
+"""
+
+
+def search_backend(conn=connection):
+    if conn.vendor in ('sqlite', 'postgresql'):
+        return conn.vendor
+    return None
+
+
+def create_index(conn=connection):
+    backend = search_backend(conn)
+    with conn.cursor() as cursor:
+        if backend == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                f"{', '.join(FTS5_COLUMNS)}, tokenize='unicode61 remove_diacritics 2')"
+            )
+        elif backend == 'postgresql':
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                f"product_id bigint PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE, "
+                f"document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)")
+
+
+def drop_index(conn=connection):
+    if search_backend(conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def _reindex(where='', params=(), conn=connection):
+    backend = search_backend(conn)
+    if not backend:
+        return
+    condition = f"WHERE {where}" if where else ''
+    with conn.cursor() as cursor:
+        if backend == 'sqlite':
+            if where:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT p.id {SOURCE_JOINS} {condition})", params)
+            else:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(FTS5_COLUMNS)}) "
+                f"SELECT p.id, p.name, p.sku, b.name, c.name, s.name, p.description {SOURCE_JOINS} {condition}",
+                params,
+            )
+        else:
+            if not where:
+                cursor.execute(f"TRUNCATE {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (product_id, document) SELECT p.id, {PG_DOCUMENT} {SOURCE_JOINS} {condition} "
+                f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                params,
+            )
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        chunk = ids[start:start + ID_BATCH_SIZE]
+        yield chunk, ', '.join(['%s'] * len(chunk))
+
+
+def index_products(product_ids):
+    for chunk, placeholders in _batches(product_ids):
+        _reindex(f"p.id IN ({placeholders})", chunk)
+
+
+def index_related(field, pks):
+    """Reindex the products whose field (main_category, sub_category or brand) points at one of pks."""
+    for chunk, placeholders in _batches(pks):
+        _reindex(f"p.{field}_id IN ({placeholders})", chunk)
+
+
+def remove_products(product_ids):
+    backend = search_backend()
+    if not backend:
+        return
+    key = 'rowid' if backend == 'sqlite' else 'product_id'
+    with connection.cursor() as cursor:
+        for chunk, placeholders in _batches(product_ids):
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({placeholders})", chunk)
+
+
+def reindex_products(product_ids):
+    """Bring the rows for product_ids up to date, dropping those whose product is gone."""
+    product_ids = list(product_ids)
+    remove_products(product_ids)
+    index_products(product_ids)
+
+
+def rebuild_index(conn=connection):
+    _reindex(conn=conn)
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def icontains_filter(queryset, query):
+    return queryset.filter(
+        Q(name__icontains=query) |
+        Q(description__icontains=query) |
+        Q(main_category__name__icontains=query) |
+        Q(sub_category__name__icontains=query) |
+        Q(brand__name__icontains=query) |
+        Q(sku__icontains=query)
+    )
+
+
+def search_products(queryset, query):
+    """
+    Narrow a Product queryset to matches for query, best first. Every term
+    has to match (as a word prefix) somewhere in the indexed text; the
+    search_rank annotation holds the relevance score.
+    """
+    terms = search_terms(query)
+    backend = search_backend()
+    if not terms or not backend:
+        return icontains_filter(queryset, query)
+
+    table = queryset.model._meta.db_table
+    if backend == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in FTS5_WEIGHTS)
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[f'{SEARCH_TABLE}.rowid = "{table}"."id"', f'{SEARCH_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'-bm25({SEARCH_TABLE}, {weights})'},
+        ).order_by('-search_rank', '-id')
+
+    tsquery = "to_tsquery('simple', %s)"
+    match = ' & '.join(f'{term}:*' for term in terms)
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE}.product_id = "{table}"."id"', f'{SEARCH_TABLE}.document @@ {tsquery}'],
+        params=[match],
+        select={'search_rank': f'ts_rank({SEARCH_TABLE}.document, {tsquery})'},
+        select_params=[match],
+    ).order_by('-search_rank', '-id')
@@ -0,0 +1,123 @@
+"""
+Cached home page sections.
+
+The category grid, the new arrivals, top selling and featured rows, each
+category's top products and the first page of "All Products" are built
+together as plain card dicts and kept under one cache key, tagged with the
+catalog version they were built from. Any product, image or category change
+bumps the version (products.signals). The next request still gets the
+cached copy, and that request starts a rebuild in a background thread.
+Sections older than HOME_SECTIONS_MAX_AGE are refreshed the same way, since
+view counts (top selling) change without any signal. Only the first request
+after a cache miss builds inline.
+"""
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from core.pagination import KeysetPage, KeysetPaginator
+from .cache import get_catalog_version
+from .models import Product, ProductMainCategory
+from .pagination import PRODUCT_ORDERINGS
+
+logger = logging.getLogger(__name__)
+
+HOME_SECTIONS_MAX_AGE = getattr(settings, 'HOME_SECTIONS_MAX_AGE', 10 * 60)
+HOME_SECTIONS_TIMEOUT = getattr(settings, 'HOME_SECTIONS_TIMEOUT', 24 * 60 * 60)
+HOME_SECTIONS_BACKGROUND = getattr(settings, 'HOME_SECTIONS_BACKGROUND', True)
+HOME_SECTIONS_KEY = 'products:home-sections'
+HOME_SECTION_SIZE = 8
+HOME_PAGE_SIZE = 12
+REBUILD_LOCK_TIMEOUT = 60
+
+
+def product_card(product):
+    """The fields frontend/partials/_product_card.html reads, as a picklable dict."""
+    return {
+        'id': product.pk,
+        'name': product.name,
+        'slug': product.slug,
+        'price': product.price,
+        'sale_price': product.sale_price,
+        'on_sale': product.on_sale(),
+        'in_stock': product.in_stock(),
+        'get_primary_image': product.get_primary_image(),
+        'display_badge': product.display_badge,
+    }
+
+
+def _cards(products, badge=None):
+    return [(product_card(product), badge or product.display_badge) for product in products]
+
+
+def build_home_sections(version=None):
+    catalog = Product.objects.for_cards().filter(is_active=True)
+    newest = catalog.order_by(*PRODUCT_ORDERINGS['newest'])
+    top_products = catalog.top_per_category(HOME_SECTION_SIZE)
+    categories = (
+        ProductMainCategory.objects.annotate(product_count=Count('products'))
+        .filter(is_active=True, product_count__gt=0)
+        .order_by('name')
+    )
+    first_page = KeysetPaginator(newest, PRODUCT_ORDERINGS['newest'], per_page=HOME_PAGE_SIZE).page()
+    return {
+        'version': version,
+        'built_at': time.time(),
+        'categories': [
+            {
+                'id': category.pk,
+                'name': category.name,
+                'get_image_url': category.get_image_url(),
+                'top_products': _cards(top_products.get(category.pk, [])),
+            }
+            for category in categories
+        ],
+        'new_arrivals': _cards(newest[:HOME_SECTION_SIZE], ("🆕 New Arrival", "bg-success")),
+        'featured_products': _cards(catalog.filter(is_featured=True)[:HOME_SECTION_SIZE], ("⭐ Featured", "bg-primary")),
+        'top_selling': _cards(catalog.order_by('-total_views')[:HOME_SECTION_SIZE], ("🏆 Best Seller", "bg-warning text-dark")),
+        'page_obj': KeysetPage(
+            _cards(first_page), first_page.has_next, False, next_token=first_page.next_token,
+        ),
+    }
+
+
+def _rebuild(version):
+    try:
+        cache.set(HOME_SECTIONS_KEY, build_home_sections(version), HOME_SECTIONS_TIMEOUT)
+    except Exception:
+        logger.exception("Rebuilding the home page sections failed")
+    finally:
+        cache.delete(f'{HOME_SECTIONS_KEY}:rebuilding')
+
+
+def _rebuild_in_background(version):
+    try:
+        _rebuild(version)
+    finally:
+        connection.close()
+
+
+def refresh_home_sections(version):
+    """Rebuild the sections for version unless a rebuild is already running somewhere."""
+    if not cache.add(f'{HOME_SECTIONS_KEY}:rebuilding', version, REBUILD_LOCK_TIMEOUT):
+        return False
+    if HOME_SECTIONS_BACKGROUND:
+        threading.Thread(target=_rebuild_in_background, args=(version,), daemon=True).start()
+    else:
+        _rebuild(version)
+    return True
+
+
+def get_home_sections():
+    """The cached sections, possibly one catalog change behind while a rebuild runs."""
+    version = get_catalog_version()
+    sections = cache.get(HOME_SECTIONS_KEY)
+    if sections is None:
+        sections = build_home_sections(version)
+        cache.set(HOME_SECTIONS_KEY, sections, HOME_SECTIONS_TIMEOUT)
+    elif sections['version'] != version or time.time() - sections['built_at'] > HOME_SECTIONS_MAX_AGE:
+        refresh_home_sections(version)
+    return sections
@@ -0,0 +1,96 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import bulk_changed
+from .models import Brand, Product, ProductImage, ProductMainCategory, ProductSubCategory
+from . import search, suggest
+from .cache import bump_catalog_version
+
+# Product fields copied into the search index (FKs as field name or attname)
+SEARCH_FIELDS = {
+    'name', 'sku', 'description',
+    'main_category', 'main_category_id', 'sub_category', 'sub_category_id', 'brand', 'brand_id',
+}
+SUGGEST_KINDS = {
+    Product: 'product',
+    ProductMainCategory: 'category',
+    ProductSubCategory: 'sub_category',
+    Brand: 'brand',
+}
+RELATED_SEARCH_FIELDS = {
+    ProductMainCategory: 'main_category',
+    ProductSubCategory: 'sub_category',
+    Brand: 'brand',
+}
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not SEARCH_FIELDS & set(update_fields):
+        return
+    search.index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.remove_products([instance.pk])
+
+
+@receiver(post_save, sender=ProductMainCategory)
+@receiver(post_save, sender=ProductSubCategory)
+@receiver(post_save, sender=Brand)
+def index_related_products(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or (update_fields and 'name' not in update_fields):
+        return
+    search.index_related(RELATED_SEARCH_FIELDS[sender], [instance.pk])
+
+
+@receiver(bulk_changed, sender=Product)
+@receiver(bulk_changed, sender=ProductMainCategory)
+@receiver(bulk_changed, sender=ProductSubCategory)
+@receiver(bulk_changed, sender=Brand)
+def reindex_bulk_changes(sender, pks=None, **kwargs):
+    if pks is None:
+        search.rebuild_index()
+    elif sender is Product:
+        search.reindex_products(pks)
+    else:
+        search.index_related(RELATED_SEARCH_FIELDS[sender], pks)
+
+
+def bump_catalog(kind, pks=None):
+    """
+    Run on commit: move the catalog version on, which invalidates the home
+    sections, facet labels and every process's suggest index, then patch
+    this process's suggest index with the changed rows.
+    """
+    version = bump_catalog_version()
+    suggest.update_index(version, kind, pks)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductMainCategory)
+@receiver(post_delete, sender=ProductMainCategory)
+@receiver(post_save, sender=ProductSubCategory)
+@receiver(post_delete, sender=ProductSubCategory)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def catalog_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(bump_catalog, SUGGEST_KINDS[sender], [instance.pk]))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, **kwargs):
+    # Cards show the primary image, so cached listings are out of date too
+    transaction.on_commit(partial(bump_catalog, 'product', [instance.product_id]))
+
+
+@receiver(bulk_changed, sender=Product)
+@receiver(bulk_changed, sender=ProductMainCategory)
+@receiver(bulk_changed, sender=ProductSubCategory)
+@receiver(bulk_changed, sender=Brand)
+def catalog_bulk_changed(sender, pks=None, **kwargs):
+    transaction.on_commit(partial(bump_catalog, SUGGEST_KINDS[sender], pks))
@@ -0,0 +1,209 @@
+"""
+In-process prefix index behind /search/suggest/.
+
+Every word suffix of a product, brand or category name ("sony wh 1000xm4",
+"wh 1000xm4", "1000xm4") is kept in one sorted list, so the entries for a
+typed prefix are a contiguous slice found with two bisects. The slice is
+ranked by total_views (summed over active products for brands and
+categories) and the top results are memoized per prefix until the index
+changes.
+
+Each process builds its own index on first use and tags it with the catalog
+version from products.cache. The version itself is bumped by products.signals;
+after a save in this process it hands the changed rows to update_index(),
+which patches a copy of the index and swaps it in, so a lookup running in
+another thread only ever sees a whole index, never one half way through an
+update; a published index is not modified again. Changes made by other processes
+bump the version and are picked up, with a full rebuild, the next time the
+version is checked (at most every SEARCH_SUGGEST_CHECK_INTERVAL seconds).
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+from itertools import chain
+from urllib.parse import urlencode
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.urls import reverse
+from .cache import get_catalog_version
+from .models import Brand, Product, ProductMainCategory, ProductSubCategory
+
+SEARCH_SUGGEST_LIMIT = getattr(settings, 'SEARCH_SUGGEST_LIMIT', 8)
+SEARCH_SUGGEST_CHECK_INTERVAL = getattr(settings, 'SEARCH_SUGGEST_CHECK_INTERVAL', 2)
+MEMO_SIZE = 4096
+
+
+def normalize(text):
+    return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+def product_entries(pks=None):
+    products = Product.objects.filter(pk__in=pks) if pks is not None else Product.objects.all()
+    # reverse() once; slugs are already URL safe
+    url = reverse('product_detail', args=['__slug__'])
+    for pk, name, slug, views in products.values_list('pk', 'name', 'slug', 'total_views'):
+        yield ('product', pk), name, url.replace('__slug__', slug), views
+
+
+def _grouped_entries(kind, model, pks, url_for):
+    rows = model.objects.filter(pk__in=pks) if pks is not None else model.objects.all()
+    rows = rows.annotate(views=Sum('products__total_views', filter=Q(products__is_active=True)))
+    for pk, name, views in rows.values_list('pk', 'name', 'views'):
+        yield (kind, pk), name, url_for(pk, name), views or 0
+
+
+def brand_entries(pks=None):
+    url = reverse('product_list')
+    return _grouped_entries('brand', Brand, pks, lambda pk, name: f"{url}?{urlencode({'search': name})}")
+
+
+def category_entries(pks=None):
+    url = reverse('product_list')
+    return _grouped_entries('category', ProductMainCategory, pks, lambda pk, name: f"{url}?category={pk}")
+
+
+def sub_category_entries(pks=None):
+    url = reverse('product_list')
+    return _grouped_entries('sub_category', ProductSubCategory, pks, lambda pk, name: f"{url}?{urlencode({'search': name})}")
+
+
+LOADERS = {
+    'product': product_entries,
+    'brand': brand_entries,
+    'category': category_entries,
+    'sub_category': sub_category_entries,
+}
+
+
+class PrefixIndex:
+    def __init__(self, version=None):
+        self.version = version
+        self.keys = []      # sorted (normalized suffix, entry id)
+        self.weights = []   # weight of the entry behind each key, parallel to keys
+        self.entries = {}   # entry id -> (kind, label, url, weight)
+        self.memo = {}
+
+    def copy(self, version=None):
+        """A new index with the same entries (and an empty memo), for patching off to the side."""
+        index = PrefixIndex(version)
+        index.keys = list(self.keys)
+        index.weights = list(self.weights)
+        index.entries = dict(self.entries)
+        return index
+
+    @staticmethod
+    def suffixes(label):
+        words = normalize(label).split()
+        return [' '.join(words[i:]) for i in range(len(words))]
+
+    def add(self, entry_id, label, url, weight):
+        self.remove(entry_id)
+        self.entries[entry_id] = (entry_id[0], label, url, weight)
+        for key in self.suffixes(label):
+            position = bisect.bisect_left(self.keys, (key, entry_id))
+            self.keys.insert(position, (key, entry_id))
+            self.weights.insert(position, weight)
+        self.memo.clear()
+
+    def remove(self, entry_id):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in self.suffixes(entry[1]):
+            position = bisect.bisect_left(self.keys, (key, entry_id))
+            if position < len(self.keys) and self.keys[position] == (key, entry_id):
+                del self.keys[position]
+                del self.weights[position]
+        self.memo.clear()
+
+    def load(self, entries):
+        """Bulk add: one sort instead of an insert per key."""
+        for entry_id, label, url, weight in entries:
+            self.entries[entry_id] = (entry_id[0], label, url, weight)
+            self.keys.extend((key, entry_id) for key in self.suffixes(label))
+        self.keys.sort()
+        self.weights = [self.entries[entry_id][3] for _, entry_id in self.keys]
+        self.memo.clear()
+
+    def lookup(self, prefix, limit=SEARCH_SUGGEST_LIMIT):
+        memo_key = (prefix, limit)
+        results = self.memo.get(memo_key)
+        if results is None:
+            start = bisect.bisect_left(self.keys, (prefix,))
+            end = bisect.bisect_left(self.keys, (prefix + '\uffff',), start)
+            # One entry can sit under several matching suffixes, so take a few
+            # spare positions and drop repeats
+            best = []
+            for position in heapq.nlargest(limit * 2, range(start, end), key=self.weights.__getitem__):
+                entry_id = self.keys[position][1]
+                if entry_id not in best:
+                    best.append(entry_id)
+            results = [
+                {'type': kind, 'label': label, 'url': url}
+                for kind, label, url, _ in (self.entries[entry_id] for entry_id in best[:limit])
+            ]
+            if len(self.memo) >= MEMO_SIZE:
+                self.memo.clear()
+            self.memo[memo_key] = results
+        return results
+
+
+_index = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def build_index(version=None):
+    index = PrefixIndex(version)
+    index.load(chain.from_iterable(loader() for loader in LOADERS.values()))
+    return index
+
+
+def get_index():
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < SEARCH_SUGGEST_CHECK_INTERVAL:
+        return _index
+    version = get_catalog_version()
+    with _lock:
+        if _index is None or _index.version != version:
+            _index = build_index(version)
+        _checked_at = now
+    return _index
+
+
+def reset_index():
+    global _index
+    with _lock:
+        _index = None
+
+
+def update_index(version, kind=None, pks=None):
+    """
+    Bring this process's index up to version, the catalog version that
+    products.signals just bumped to, by patching in the given rows. Without
+    pks (bulk changes) or when another process bumped the version in
+    between, the index is dropped and rebuilt on next use.
+    """
+    global _index
+    with _lock:
+        if _index is None:
+            return
+        if pks is None or _index.version != version - 1:
+            _index = None
+            return
+        index = _index.copy(version)
+        for pk in pks:
+            index.remove((kind, pk))
+        for entry_id, label, url, weight in LOADERS[kind](pks):
+            index.add(entry_id, label, url, weight)
+        _index = index
+
+
+def suggest(query, limit=SEARCH_SUGGEST_LIMIT):
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    return get_index().lookup(prefix, limit)
@@ -1,3 +1,397 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from core.models import bulk_changed
+from core.pagination import KeysetPaginator
+from core.versions import forget_versions
+from core.testing import RouteQueryBudgetMixin, seed_catalog
+from .models import Brand, Product, ProductMainCategory, ProductView, ProductViewDaily
+from .facets import PRICE_BUCKETS, apply_filters, facet_counts, parse_filters
+from .pagination import PRODUCT_ORDERINGS
+from .cache import bump_catalog_version, get_catalog_version
+from .search import SEARCH_TABLE, search_products
+from .tracking import view_buffer
+from .trending import rolled_up_until, rollup_views, update_trending_scores
+from . import jobs
+from . import search, sections, suggest
 
-# Create your tests here.
+
+class ProductRouteQueryBudgetTests(RouteQueryBudgetMixin, TestCase):
+    urlconfs = ['products.urls']
+    default_budget = (8, 50)
+    budgets = {
+        'products:product_sub_category': (9, 70),
+        'products:product_list': (12, 90),
+        'products:product_details': (13, 50),
+        'products:edit_product': (13, 60),
+        'products:delete_product_image': (11, 50),
+        'products:wishlist': (8, 65),
+        'products:frontend_wishlist': (7, 65),
+    }
+    route_objects = {
+        'products:variant_update': {'pk': 'variant'},
+        'products:variant_delete': {'pk': 'variant'},
+        'products:inventory_log_update': {'pk': 'inventory_log'},
+        'products:inventory_log_delete': {'pk': 'inventory_log'},
+    }
+
+
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(20)
+        cls.category = ProductMainCategory.objects.first()
+        cls.brand = Brand.objects.first()
+        cls.product = Product.objects.create(
+            name='Quasar Trail Runner', sku='QTR-1', price=10,
+            main_category=cls.category, brand=cls.brand,
+        )
+        Product.objects.create(
+            name='Plain Sock', description='Pairs well with a quasar trail runner', price=2,
+            main_category=cls.category,
+        )
+
+    def search(self, query):
+        return [product.name for product in search_products(Product.objects.for_cards(), query)]
+
+    def test_ranks_name_matches_first(self):
+        self.assertEqual(self.search('quasar trail'), ['Quasar Trail Runner', 'Plain Sock'])
+        self.assertEqual(self.search('QUAS run'), ['Quasar Trail Runner', 'Plain Sock'])
+        self.assertEqual(self.search('qtr'), ['Quasar Trail Runner'])
+
+    def test_index_follows_product_and_brand_changes(self):
+        self.product.name = 'Nebula Trail Runner'
+        self.product.save()
+        self.assertEqual(self.search('nebula'), ['Nebula Trail Runner'])
+        self.assertNotIn('Nebula Trail Runner', self.search('quasar'))
+
+        self.brand.name = 'Zyzzyva'
+        self.brand.save()
+        self.assertIn('Nebula Trail Runner', self.search('zyzzyva runner'))
+
+        self.product.delete()
+        self.assertEqual(self.search('nebula'), [])
+        Product.all_objects.filter(pk=self.product.pk).hard_delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH 'nebula'")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_bulk_changes_reindex_only_their_rows(self):
+        Product.objects.filter(pk=self.product.pk).update(name='Nebula Trail Runner')
+        Brand.objects.filter(pk=self.brand.pk).update(name='Zyzzyva')
+        with mock.patch.object(search, 'rebuild_index') as rebuild:
+            bulk_changed.send(sender=Product, pks=[self.product.pk])
+            bulk_changed.send(sender=Brand, pks=[self.brand.pk])
+            self.assertEqual(self.search('zyzzyva nebula'), ['Nebula Trail Runner'])
+
+            Product.objects.filter(pk=self.product.pk).soft_delete()
+            Product.all_objects.filter(pk=self.product.pk).hard_delete()
+            bulk_changed.send(sender=Product, pks=[self.product.pk])
+        rebuild.assert_not_called()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH 'nebula'")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_falls_back_to_icontains_without_terms(self):
+        Product.objects.filter(pk=self.product.pk).update(name='Runner ++')
+        self.assertEqual(self.search('++'), ['Runner ++'])
+
+
+class SearchSuggestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = ProductMainCategory.objects.create(name='Outdoor Gear', slug='outdoor-gear')
+        cls.brand = Brand.objects.create(name='Quasar')
+        cls.popular = Product.objects.create(
+            name='Quasar Trail Runner', price=10, total_views=50, main_category=cls.category, brand=cls.brand,
+        )
+        cls.quiet = Product.objects.create(
+            name='Trail Sock', price=2, total_views=5, main_category=cls.category, brand=cls.brand,
+        )
+
+    def setUp(self):
+        # The first bump creates the counter at a fresh number, which rebuilds
+        # the index instead of patching it; start from an existing counter
+        bump_catalog_version()
+        suggest.reset_index()
+
+    def labels(self, query):
+        response = self.client.get(reverse('search_suggest'), {'q': query})
+        return [item['label'] for item in response.json()['suggestions']]
+
+    def test_matches_word_prefixes_ranked_by_views(self):
+        self.assertEqual(self.labels('trail'), ['Quasar Trail Runner', 'Trail Sock'])
+        # The brand ranks by its products' combined views
+        self.assertEqual(self.labels('QUAS'), ['Quasar', 'Quasar Trail Runner'])
+        self.assertEqual(self.labels('outdoor g'), ['Outdoor Gear'])
+        self.assertEqual(self.labels('  '), [])
+
+    def test_answers_from_memory(self):
+        self.labels('trail')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels('tra'), ['Quasar Trail Runner', 'Trail Sock'])
+
+    def test_saves_patch_the_index(self):
+        self.labels('trail')
+        index = suggest.get_index()
+        with mock.patch.object(suggest, 'build_index') as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.quiet.name = 'Trail Gaiter'
+                self.quiet.total_views = 500
+                self.quiet.save()
+            self.assertEqual(self.labels('trail'), ['Trail Gaiter', 'Quasar Trail Runner'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.quiet.delete()
+            self.assertEqual(self.labels('trail'), ['Quasar Trail Runner'])
+        build.assert_not_called()
+        # The patches went to copies; a lookup still holding the old index sees it whole
+        self.assertEqual([item['label'] for item in index.lookup('trail')], ['Quasar Trail Runner', 'Trail Sock'])
+
+    def test_saves_bump_the_catalog_version_themselves(self):
+        before = get_catalog_version()
+        with mock.patch.object(suggest, 'update_index') as update:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.quiet.save()
+        self.assertEqual(get_catalog_version(), before + 1)
+        update.assert_called_once_with(before + 1, 'product', [self.quiet.pk])
+
+    def test_bulk_soft_deletes_patch_the_index(self):
+        self.labels('trail')
+        with mock.patch.object(suggest, 'build_index') as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                Product.objects.filter(pk=self.quiet.pk).soft_delete()
+            self.assertEqual(self.labels('trail'), ['Quasar Trail Runner'])
+        build.assert_not_called()
+
+
+class FacetCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(60)
+
+    def test_counts_match_filtered_queries(self):
+        catalog = Product.objects.filter(is_active=True)
+        category, brand = catalog.values_list('main_category_id', 'brand_id').first()
+        filters = parse_filters(QueryDict(f'category={category}&brand={brand}&price=1000-&stock=in-stock'))
+
+        facets = facet_counts(catalog, filters)
+        self.assertEqual(facets['total'], apply_filters(catalog, filters).count())
+
+        # Each facet ignores its own selection but applies the others
+        for facet, values in (('category', facets['category']), ('brand', facets['brand'])):
+            for value in values:
+                expected = apply_filters(catalog, {**filters, facet: {value['id']}}).count()
+                self.assertEqual(value['product_count'], expected, f"{facet} {value['name']}")
+        for index, (key, *_) in enumerate(PRICE_BUCKETS):
+            bucket = next((value for value in facets['price'] if value['id'] == key), None)
+            expected = apply_filters(catalog, {**filters, 'price': {index}}).count()
+            self.assertEqual(bucket['product_count'] if bucket else 0, expected, key)
+        self.assertEqual(facets['stock']['count'], apply_filters(catalog, filters).count())
+        self.assertEqual(facets['sale']['count'], apply_filters(catalog, {**filters, 'sale': {True}}).count())
+
+    def test_query_stays_the_same_size_with_a_large_taxonomy(self):
+        # More brands than SQLite's 2000 column limit, most without products
+        Brand.objects.bulk_create([Brand(name=f'Facet Brand {number}') for number in range(2100)])
+        cache.clear()
+        forget_versions()
+        get_catalog_version()
+        # Two for the cached category and brand names, four for the counts
+        with self.assertNumQueries(6):
+            facets = facet_counts(Product.objects.filter(is_active=True), parse_filters(QueryDict('')))
+        self.assertEqual(sum(value['product_count'] for value in facets['brand']),
+                         Product.objects.filter(is_active=True, brand__isnull=False).count())
+
+    def test_prices_bucket_by_the_shown_price(self):
+        product = Product.objects.filter(is_active=True).first()
+        Product.objects.filter(pk=product.pk).update(price=Decimal('300'), sale_price=Decimal('20'))
+        catalog = Product.objects.filter(pk=product.pk)
+        facets = facet_counts(catalog, parse_filters(QueryDict('')))
+        self.assertEqual([value['id'] for value in facets['price']], ['0-25'])
+        self.assertEqual(apply_filters(catalog, parse_filters(QueryDict('price=0-25'))).count(), 1)
+
+    def test_list_ignores_parameters_it_has_no_filter_for(self):
+        # Product has no rating column; an old ?rating= link must not break the page
+        response = self.client.get(reverse('product_list'), {'rating': ['4', '5']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['products']), 12)
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(30)
+        # Ties on price make the id tie-breaker do the work
+        Product.objects.filter(pk__in=Product.objects.order_by('pk').values('pk')[:10]).update(price=10)
+
+    def walk(self, ordering):
+        paginator = KeysetPaginator(Product.objects.all(), ordering, per_page=7)
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(pages[-1].next_token))
+        return paginator, pages
+
+    def test_pages_cover_the_ordering_once(self):
+        for sort, ordering in PRODUCT_ORDERINGS.items():
+            _, pages = self.walk(ordering)
+            seen = [product.pk for page in pages for product in page]
+            expected = list(Product.objects.order_by(*ordering).values_list('pk', flat=True))
+            self.assertEqual(seen, expected, sort)
+            self.assertFalse(pages[0].has_previous)
+
+    def test_previous_returns_the_same_page(self):
+        paginator, pages = self.walk(PRODUCT_ORDERINGS['price-low'])
+        for before, page in zip(pages, pages[1:]):
+            back = paginator.page(page.previous_token)
+            self.assertEqual([p.pk for p in back], [p.pk for p in before])
+            self.assertEqual(back.has_previous, before.has_previous)
+
+    def test_bad_or_foreign_token_starts_over(self):
+        paginator, pages = self.walk(PRODUCT_ORDERINGS['name'])
+        first = [p.pk for p in pages[0]]
+        self.assertEqual([p.pk for p in paginator.page('garbage')], first)
+        other = KeysetPaginator(Product.objects.all(), PRODUCT_ORDERINGS['views'], per_page=7)
+        self.assertEqual([p.pk for p in paginator.page(other.page().next_token)], first)
+
+
+class TopPerCategoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(40)
+
+    def expected(self, catalog, limit):
+        return {
+            category: list(catalog.filter(main_category_id=category).order_by('-total_views', '-id')[:limit])
+            for category in catalog.values_list('main_category_id', flat=True).distinct()
+        }
+
+    def test_matches_per_category_queries(self):
+        catalog = Product.objects.for_cards().filter(is_active=True)
+        expected = self.expected(catalog, 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(catalog.top_per_category(3), expected)
+        # Without window functions the correlated subquery gives the same rows
+        with mock.patch.object(connection.features, 'supports_over_clause', False):
+            with self.assertNumQueries(1):
+                self.assertEqual(catalog.top_per_category(3), expected)
+
+
+class HomeSectionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(20)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_home_page_runs_no_queries(self):
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+
+    @mock.patch.object(sections, 'HOME_SECTIONS_BACKGROUND', False)
+    def test_catalog_change_serves_stale_then_rebuilds(self):
+        self.client.get(reverse('home'))
+        product = Product.objects.order_by('-created_at', '-id').first()
+        product.name = 'Renamed Arrival'
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+
+        # The request that notices the change still gets the old sections
+        names = [card['name'] for card, _ in self.client.get(reverse('home')).context['new_arrivals']]
+        self.assertNotIn('Renamed Arrival', names)
+        names = [card['name'] for card, _ in self.client.get(reverse('home')).context['new_arrivals']]
+        self.assertIn('Renamed Arrival', names)
+
+
+class ProductViewBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(10)
+
+    def setUp(self):
+        cache.clear()
+        view_buffer.flush()
+        patcher = mock.patch.object(view_buffer, 'flush_interval', 10 ** 9)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_views_are_deduplicated_and_written_in_one_batch(self):
+        first, second = Product.objects.order_by('pk')[:2]
+        views_before = ProductView.objects.count()
+        for product in (first, first, second):
+            response = self.client.get(reverse('product_detail', args=[product.slug]))
+            self.assertEqual(response.status_code, 200)
+        other = self.client_class(HTTP_USER_AGENT='another browser')
+        other.get(reverse('product_detail', args=[first.slug]))
+
+        # Nothing is written during the requests
+        self.assertEqual(ProductView.objects.count(), views_before)
+        # savepoint, bulk insert, an update for +2 and one for +1, release
+        with self.assertNumQueries(5):
+            self.assertEqual(view_buffer.flush(), 3)
+
+        self.assertEqual(ProductView.objects.count(), views_before + 3)
+        first_views, second_views = first.total_views, second.total_views
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.total_views, first_views + 2)
+        self.assertEqual(second.total_views, second_views + 1)
+
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(10)
+        ProductView.objects.all().delete()
+        cls.old, cls.recent = Product.objects.order_by('pk')[:2]
+        now = timezone.now()
+        ProductView.objects.bulk_create(
+            [ProductView(product=cls.old, created_at=now - timedelta(days=10, minutes=i)) for i in range(20)]
+            + [ProductView(product=cls.recent, created_at=now - timedelta(minutes=i)) for i in range(5)]
+        )
+
+    def daily(self):
+        return {(row.product_id, row.date): row.views for row in ProductViewDaily.objects.all()}
+
+    def test_rollup_is_idempotent_and_incremental(self):
+        rollup_views()
+        first = self.daily()
+        self.assertEqual(sum(first.values()), 25)
+        rollup_views()
+        self.assertEqual(self.daily(), first)
+
+        ProductView.objects.create(product=self.recent)
+        rollup_views()
+        self.assertEqual(sum(self.daily().values()), 26)
+
+    def test_recent_views_outrank_older_ones(self):
+        rollup_views()
+        update_trending_scores()
+        self.old.refresh_from_db()
+        self.recent.refresh_from_db()
+        self.assertGreater(self.recent.trending_score, self.old.trending_score)
+        self.assertGreater(self.old.trending_score, 0)
+        self.assertEqual(update_trending_scores(), 0)
+
+        # Five days on, the old product's views have left the window
+        update_trending_scores(today=timezone.localdate() + timedelta(days=5))
+        self.old.refresh_from_db()
+        self.assertEqual(self.old.trending_score, 0)
+
+    def test_cleanup_only_prunes_rolled_up_views(self):
+        # Nothing is rolled up yet, so nothing may go
+        self.assertEqual(jobs.cleanup_old_views(), 0)
+        rollup_views()
+        with mock.patch.object(jobs, 'PRODUCT_VIEW_RETENTION_DAYS', 0):
+            self.assertEqual(jobs.cleanup_old_views(), 20)
+        self.assertEqual(ProductView.objects.count(), 5)
+        self.assertEqual(sum(self.daily().values()), 25)
@@ -0,0 +1,69 @@
+import hashlib
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from core.buffer import WriteBehindBuffer
+from .models import Product, ProductView
+from .utils import get_client_ip
+
+# One counted view per viewer and product within this many seconds
+PRODUCT_VIEW_DEDUPE_WINDOW = getattr(settings, 'PRODUCT_VIEW_DEDUPE_WINDOW', 24 * 60 * 60)
+
+
+class ProductViewBuffer(WriteBehindBuffer):
+    """
+    Buffers product detail views per (product, viewer) and writes them with
+    one bulk_create of ProductView rows plus one total_views update per
+    distinct increment. Views still pending when a process dies are lost,
+    so max_size bounds how many can go missing.
+    """
+
+    def merge(self, old, new):
+        # Keep the first view; its timestamp is the one that counts
+        return old
+
+    def write(self, items):
+        views = [
+            ProductView(product_id=product_id, session_key=viewer, **view)
+            for (product_id, viewer), view in items.items()
+        ]
+        increments = defaultdict(list)
+        for product_id, count in Counter(product_id for product_id, _ in items).items():
+            increments[count].append(product_id)
+
+        with transaction.atomic():
+            ProductView.objects.bulk_create(views)
+            for count, product_ids in increments.items():
+                Product.all_objects.filter(pk__in=product_ids).update(total_views=F('total_views') + count)
+        return len(views)
+
+
+view_buffer = ProductViewBuffer(
+    flush_interval=getattr(settings, 'PRODUCT_VIEW_FLUSH_INTERVAL', 10),
+    max_size=getattr(settings, 'PRODUCT_VIEW_BUFFER_SIZE', 500),
+)
+
+
+def viewer_key(request):
+    """The session key, or a stand-in hashed from IP and user agent so anonymous views don't create sessions."""
+    if request.session.session_key:
+        return request.session.session_key
+    fingerprint = f"{get_client_ip(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def record_view(product, request):
+    """Count a view of product unless this viewer was already counted; returns True for a new view."""
+    viewer = viewer_key(request)
+    if not cache.add(f'products:viewed:{product.pk}:{viewer}', 1, PRODUCT_VIEW_DEDUPE_WINDOW):
+        return False
+    view_buffer.add((product.pk, viewer), {
+        'user_id': request.user.pk if request.user.is_authenticated else None,
+        'ip_address': get_client_ip(request),
+        'user_agent': request.META.get('HTTP_USER_AGENT', '')[:255],
+        'created_at': timezone.now(),
+    })
+    return True
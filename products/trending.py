@@ -0,0 +1,89 @@
+"""
+Daily product view rollups and trending scores.
+
+rollup_views() folds raw ProductView rows into one ProductViewDaily row per
+product and day. Each run recounts from the day before the newest rolled up
+day, so it is idempotent and needs no watermark. That window covers the
+partial day the previous run stopped in, plus any views the view buffer
+flushed late. Raw rows from before rolled_up_until() are final and can be
+pruned.
+
+update_trending_scores() sets Product.trending_score to the views of the
+last PRODUCT_TRENDING_WINDOW_DAYS days. Each day counts
+0.5 ** (age in days / PRODUCT_TRENDING_HALF_LIFE_DAYS), and the whole score
+comes from one grouped query over the rollups.
+"""
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Case, Count, F, FloatField, Max, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Product, ProductView, ProductViewDaily
+
+PRODUCT_TRENDING_WINDOW_DAYS = getattr(settings, 'PRODUCT_TRENDING_WINDOW_DAYS', 14)
+PRODUCT_TRENDING_HALF_LIFE_DAYS = getattr(settings, 'PRODUCT_TRENDING_HALF_LIFE_DAYS', 3)
+BATCH_SIZE = 1000
+
+
+def rolled_up_until():
+    """Raw views before this time are counted in ProductViewDaily for good (None before the first rollup)."""
+    latest = ProductViewDaily.objects.aggregate(latest=Max('date'))['latest']
+    if latest is None:
+        return None
+    return timezone.make_aware(datetime.combine(latest - timedelta(days=1), time.min))
+
+
+def _save_rollups(rows):
+    ProductViewDaily.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['product', 'date'], update_fields=['views'],
+    )
+
+
+def rollup_views():
+    """Recount the open days of raw views into ProductViewDaily; returns the rows written."""
+    views = ProductView.objects.order_by()
+    start = rolled_up_until()
+    if start is not None:
+        views = views.filter(created_at__gte=start)
+    counts = views.annotate(day=TruncDate('created_at')).values('product_id', 'day').annotate(views=Count('id'))
+
+    rows, written = [], 0
+    for count in counts.iterator():
+        rows.append(ProductViewDaily(product_id=count['product_id'], date=count['day'], views=count['views']))
+        if len(rows) >= BATCH_SIZE:
+            _save_rollups(rows)
+            written += len(rows)
+            rows = []
+    if rows:
+        _save_rollups(rows)
+        written += len(rows)
+    return written
+
+
+def update_trending_scores(today=None):
+    """Recompute Product.trending_score from the rollups; returns the number of products changed."""
+    today = today or timezone.localdate()
+    weight = Case(
+        *[
+            When(date=today - timedelta(days=age), then=Value(0.5 ** (age / PRODUCT_TRENDING_HALF_LIFE_DAYS)))
+            for age in range(PRODUCT_TRENDING_WINDOW_DAYS)
+        ],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    scores = dict(
+        ProductViewDaily.objects.filter(date__gt=today - timedelta(days=PRODUCT_TRENDING_WINDOW_DAYS))
+        .order_by().values('product_id')
+        .annotate(score=Sum(F('views') * weight, output_field=FloatField()))
+        .values_list('product_id', 'score')
+    )
+    # Products that dropped out of the window go back to zero
+    current = dict(Product.all_objects.filter(trending_score__gt=0).values_list('pk', 'trending_score'))
+
+    changed = []
+    for pk in scores.keys() | current.keys():
+        score = round(scores.get(pk, 0.0), 4)
+        if score != current.get(pk, 0.0):
+            changed.append(Product(pk=pk, trending_score=score))
+    Product.all_objects.bulk_update(changed, ['trending_score'], batch_size=BATCH_SIZE)
+    return len(changed)
@@ -3,12 +3,13 @@ from .models import Brand, ProductMainCategory, ProductSubCategory, Product, Pro
 from django.utils.text import slugify
 from django.http import JsonResponse, HttpResponseRedirect
 from django.contrib import messages
-from django.db.models import Q
-from django.core.paginator import Paginator
 from django.template.loader import render_to_string
 from .forms import ProductImageForm, ProductVariantForm, InventoryLogForm
 from django.contrib.auth.decorators import login_required
+from core.pagination import KeysetPaginator
 from core.permissions import CheckUserPermission
+from .search import search_products
+from .pagination import PRODUCT_ORDERINGS
 
 # Create your views here.
 @login_required(login_url='accounts:login')
@@ -234,17 +235,12 @@ def product_list_view(request):
     sub_category_id = request.GET.get('sub_category')
     brand_id = request.GET.get('brand')
 
-    products = Product.objects.all().order_by('-created_at')
+    products = Product.objects.for_cards()
 
     if search:
-        products = products.filter(
-            Q(name__icontains=search) |
-            Q(description__icontains=search) |
-            Q(main_category__name__icontains=search) |
-            Q(sub_category__name__icontains=search) |
-            Q(brand__name__icontains=search) |
-            Q(sku__icontains=search)
-        )
+        products = search_products(products, search)
+    else:
+        products = products.order_by('-created_at')
     if main_category_id and main_category_id not in ['None', '', 'null']:
         products = products.filter(main_category_id=main_category_id)
     if sub_category_id and sub_category_id not in ['None', '', 'null']:
@@ -253,9 +249,8 @@ def product_list_view(request):
         products = products.filter(brand_id=brand_id)
 
     # Pagination
-    paginator = Paginator(products, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(products, None if search else PRODUCT_ORDERINGS['newest'], per_page=10)
+    page_obj = paginator.page(request.GET.get('cursor'))
 
     context = {
         'products': page_obj.object_list,
@@ -600,15 +595,13 @@ def toggle_wishlist(request):
 
 @login_required(login_url='accounts:login')
 def wishlist_view(request):
-    wishlist_qs = (
-        Wishlist.objects
-        .filter(user=request.user)
-        .select_related('product')
+    products = list(
+        Product.all_objects.for_cards()
+        .filter(wishlisted_by__user=request.user)
+        .order_by('wishlisted_by__id')
     )
 
-    products = [w.product for w in wishlist_qs]
-
-    user_wishlist_ids = set(w.product_id for w in wishlist_qs)
+    user_wishlist_ids = set(p.id for p in products)
 
     return render(request, 'products/wishlist/index.html', {
         'products': products,
@@ -617,15 +610,13 @@ def wishlist_view(request):
 
 @login_required(login_url='accounts:login')
 def frontend_wishlist_view(request):
-    wishlist_qs = (
-        Wishlist.objects
-        .filter(user=request.user)
-        .select_related('product')
+    products = list(
+        Product.all_objects.for_cards()
+        .filter(wishlisted_by__user=request.user)
+        .order_by('wishlisted_by__id')
     )
 
-    products = [w.product for w in wishlist_qs]
-
-    user_wishlist_ids = set(w.product_id for w in wishlist_qs)
+    user_wishlist_ids = set(p.id for p in products)
 
     return render(request, 'frontend/wishlist.html', {
         'products': products,